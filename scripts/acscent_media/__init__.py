@@ -0,0 +1,37 @@
+"""Media processing for the envelope animation and background art.
+
+Run from the scripts/ directory:
+    python -m acscent_media clean-frames --proc-dir processing
+    python -m acscent_media build-video --proc-dir processing --sink ffmpeg --crf 23 --output envelope.mp4
+    python -m acscent_media build-video --proc-dir processing/cleaned --sink webp --quality 75 --output envelope.webp
+    python -m acscent_media fix-text-color --input "../public/images/back ground.png"
+    python -m acscent_media convert-frames processing processing.npy
+    python -m acscent_media compare-frames processing processing/cleaned
+    python -m acscent_media tune paper --grid color_dist=12,18,24 --grid dark_offset=10,15,20
+    python -m acscent_media optimize-media
+    python -m acscent_media pack-atlas --proc-dir processing/final_frames --verify
+
+process_frames.py, build_video.py and fix_text_color.py are thin wrappers over these commands.
+Any of them takes --trace trace.json, --profile out.prof or --tracemalloc to report per-step timings.
+"""
+from .atlas import ATLAS_PARAMS, pack_atlas, render_atlas
+from .compare import COMPARE_PARAMS, compare_frames, psnr, ssim
+from .frame_io import PngFrames, frame_name, list_frames, read_frame
+from .frames import (
+    CURSOR_PARAMS, PAPER_PARAMS, clean_frame, detect_paper_text, paper_features, paper_pixels, paper_text_mask,
+    remove_cursor, remove_paper_text, threshold_paper_text,
+)
+from .framestore import FrameStore, convert_frames, create_frames, open_frames
+from .instrument import note, recording, span
+from .ops import (
+    INPAINT_BACKENDS, add_outline, bg_distance, blur_fill, channel_mask, composite, diffusion_fill, gaussian_blur,
+    grow_mask, inpaint, mask_bbox,
+)
+from .motion import MOTION_PARAMS, MotionInterpolator, block_motion
+from .optimize import MEDIA_PARAMS, find_sources, optimize_media
+from .pipeline import clean_frames
+from .sinks import CODECS, ConcatSink, FfmpegSink, PngSink, RawSink, StoreSink, WebpSink, make_sink
+from .temporal import TEMPORAL_PARAMS, PaperTracker
+from .text_color import TITLE_PARAMS, fix_text_color, recolor_text, title_text_mask
+from .tune import build_features, sweep
+from .timeline import INTERPOLATIONS, load_timeline, render_timeline, retime, retime_plan, timeline_length
@@ -0,0 +1,183 @@
+"""Sprite-atlas packing of a frame sequence for canvas playback on the web.
+
+    python -m acscent_media pack-atlas --proc-dir processing/final_frames --output ../public/images/envelope_atlas
+
+The first frame is stored whole; every later frame only as the tiles that
+differ from what the canvas already shows, within that frame's changed
+bounding box. Identical tiles are stored once, and frames that change nothing
+extend the previous frame's duration. Tiles are packed into atlas pages and
+index.json tells a player what to draw:
+    {"width": 320, "height": 460, "fps": 60, "tile": 32, "columns": 10,
+     "pages": ["atlas_0.webp"], "slots_per_row": 64, "slots_per_page": 4096,
+     "frames": [{"duration": 24, "bbox": [x, y, w, h], "tiles": [slot, cell, slot, cell, ...]}, ...]}
+Tiles come in (slot, cell) pairs. Atlas slot s is on page s // slots_per_page,
+at column s % slots_per_row and row (s % slots_per_page) // slots_per_row of
+that page. It is drawn at frame cell c: column c % columns, row c // columns.
+Both are in units of tile px. Every slot is a full tile (edge tiles are
+zero-padded) and the canvas clips the overhang. Frame durations are in source
+frames (multiply by 1000 / fps for ms). A player draws each frame's tiles over
+the previous canvas.
+"""
+from PIL import Image
+import numpy as np
+import hashlib
+import json
+import os
+
+from .framestore import open_frames
+
+ATLAS_PARAMS = {
+    'tile': 32,             # multiple of 16 keeps lossy WebP blocks inside one tile
+    'threshold': 0,         # per-channel difference ignored when looking for changes
+    'page_size': 2048,      # atlas page edge; 2048 fits every mobile GPU's texture limit
+    'format': 'webp',
+    'quality': None,        # None = lossless
+}
+
+
+def changed_tiles(frame, canvas, tile, threshold):
+    """(gh, gw) mask of tiles where frame differs from canvas by more than threshold."""
+    h, w = frame.shape[:2]
+    gh, gw = -(-h // tile), -(-w // tile)
+    diff = np.zeros((gh * tile, gw * tile), dtype=np.uint8)
+    diff[:h, :w] = np.abs(frame.astype(np.int16) - canvas).max(axis=2)
+    return diff.reshape(gh, tile, gw, tile).max(axis=(1, 3)) > threshold
+
+
+class AtlasPages:
+    """Equal-size tile slots filled row by row into square pages."""
+
+    def __init__(self, tile, page_size):
+        self.tile = tile
+        self.per_row = max(1, page_size // tile)
+        self.per_page = self.per_row * self.per_row
+        self.tiles = []
+
+    def add(self, pixels):
+        """Store a tile (up to tile x tile px) and return its slot number."""
+        self.tiles.append(pixels)
+        return len(self.tiles) - 1
+
+    def position(self, slot):
+        """(page, x, y) of a slot."""
+        page, k = divmod(slot, self.per_page)
+        row, col = divmod(k, self.per_row)
+        return page, col * self.tile, row * self.tile
+
+    def images(self):
+        """The filled pages as RGB arrays, each cropped to the rows it uses."""
+        pages = []
+        for start in range(0, len(self.tiles), self.per_page):
+            used = self.tiles[start:start + self.per_page]
+            rows = -(-len(used) // self.per_row)
+            cols = min(len(used), self.per_row)
+            page = np.zeros((rows * self.tile, cols * self.tile, 3), dtype=np.uint8)
+            for k, pixels in enumerate(used):
+                _, x, y = self.position(k)
+                page[y:y + pixels.shape[0], x:x + pixels.shape[1]] = pixels
+            pages.append(page)
+        return pages
+
+
+def pack_atlas(proc_dir, out_dir, fps=60, params=ATLAS_PARAMS, log=print):
+    """Pack the frames of proc_dir into out_dir (atlas pages + index.json). Returns the index."""
+    source = open_frames(proc_dir)
+    numbers = source.numbers()
+    if not numbers:
+        raise SystemExit(f'No frames found in {proc_dir}')
+    tile = params['tile']
+    h, w = source.read(numbers[0]).shape[:2]
+    canvas = np.zeros((h, w, 3), dtype=np.int16)
+    pages = AtlasPages(tile, params['page_size'])
+    columns = -(-w // tile)
+    slots = {}          # tile content hash -> atlas slot
+    frames = []
+    drawn = 0
+
+    for n, i in enumerate(numbers):
+        frame = source.read(i)[:, :, :3]
+        # The first frame is drawn whole, so the canvas never shows anything unset
+        changed = changed_tiles(frame, canvas, tile, -1 if n == 0 else params['threshold'])
+        if not changed.any():
+            frames[-1]['duration'] += 1
+            continue
+
+        rows, cols = np.nonzero(changed)
+        tiles = []
+        for ty, tx in zip(rows.tolist(), cols.tolist()):
+            y, x = ty * tile, tx * tile
+            pixels = frame[y:y + tile, x:x + tile]
+            digest = hashlib.blake2b(np.ascontiguousarray(pixels).data, digest_size=16).digest()
+            digest += repr(pixels.shape).encode()
+            if digest not in slots:
+                slots[digest] = pages.add(pixels.copy())
+            tiles += [slots[digest], ty * columns + tx]
+            canvas[y:y + tile, x:x + tile] = pixels
+        drawn += len(rows)
+        y0, x0 = rows.min() * tile, cols.min() * tile
+        y1, x1 = min((rows.max() + 1) * tile, h), min((cols.max() + 1) * tile, w)
+        frames.append({'duration': 1, 'bbox': [int(x0), int(y0), int(x1 - x0), int(y1 - y0)], 'tiles': tiles})
+
+    os.makedirs(out_dir, exist_ok=True)
+    ext = params['format']
+    names = []
+    for k, page in enumerate(pages.images()):
+        name = f'atlas_{k}.{ext}'
+        img = Image.fromarray(page)
+        path = os.path.join(out_dir, name)
+        if ext == 'webp':
+            if params['quality'] is None:
+                img.save(path, format='WEBP', lossless=True, method=6)
+            else:
+                img.save(path, format='WEBP', quality=params['quality'], method=6)
+        else:
+            img.save(path, format='PNG', optimize=True)
+        names.append(name)
+    # Pages left over from a longer previous pack
+    for name in os.listdir(out_dir):
+        if name.startswith('atlas_') and name not in names:
+            os.remove(os.path.join(out_dir, name))
+
+    index = {'version': 1, 'width': w, 'height': h, 'fps': fps, 'tile': tile, 'columns': columns,
+             'pages': names, 'slots_per_row': pages.per_row, 'slots_per_page': pages.per_page, 'frames': frames}
+    with open(os.path.join(out_dir, 'index.json'), 'w', encoding='utf-8') as f:
+        # Compact: the index is downloaded before the first frame can be drawn
+        json.dump(index, f, separators=(',', ':'))
+    log(f'{len(numbers)} frames -> {len(frames)} draws, {drawn} tiles drawn, '
+        f'{len(pages.tiles)} unique, {len(names)} atlas page(s)')
+    return index
+
+
+def render_atlas(out_dir):
+    """Replay index.json like a canvas player, yielding (duration, uint8 frame) per draw."""
+    with open(os.path.join(out_dir, 'index.json'), encoding='utf-8') as f:
+        index = json.load(f)
+    pages = []
+    for name in index['pages']:
+        with Image.open(os.path.join(out_dir, name)) as img:
+            pages.append(np.array(img.convert('RGB')))
+    tile, columns = index['tile'], index['columns']
+    per_row, per_page = index['slots_per_row'], index['slots_per_page']
+    h, w = index['height'], index['width']
+    canvas = np.zeros((h, w, 3), dtype=np.uint8)
+    for frame in index['frames']:
+        tiles = frame['tiles']
+        for slot, cell in zip(tiles[::2], tiles[1::2]):
+            page, k = divmod(slot, per_page)
+            sy, sx = (k // per_row) * tile, (k % per_row) * tile
+            dy, dx = (cell // columns) * tile, (cell % columns) * tile
+            th, tw = min(tile, h - dy), min(tile, w - dx)
+            canvas[dy:dy + th, dx:dx + tw] = pages[page][sy:sy + th, sx:sx + tw]
+        yield frame['duration'], canvas.copy()
+
+
+def atlas_budget(out_dir, index):
+    """Bytes a player downloads (pages + index) and decoded RGBA bytes it holds."""
+    files = index['pages'] + ['index.json']
+    download = sum(os.path.getsize(os.path.join(out_dir, name)) for name in files)
+    decoded = 0
+    for name in index['pages']:
+        with Image.open(os.path.join(out_dir, name)) as img:
+            decoded += img.width * img.height * 4
+    return {'download': download, 'index': os.path.getsize(os.path.join(out_dir, 'index.json')),
+            'decoded': decoded}
@@ -0,0 +1,309 @@
+"""Benchmarks for every media stage on synthetic and checked-in frames at several scales.
+
+    python -m acscent_media bench --output bench.json
+    python -m acscent_media bench --scales 1 --stages paper,png-sink --compare bench.json
+
+Each (dataset, scale, stage) runs in a freshly spawned process, so the peak RSS
+reported is that stage's own high-water mark (interpreter and inputs included)
+and nothing leaks from one stage into the next. Timing covers the stage only:
+inputs are decoded before the clock starts, except for the I/O stages whose
+cost is the decoding or encoding itself. Stage parameters stay at their
+defaults at every scale, so 2x and 4x show how each stage grows with size.
+"""
+from PIL import Image
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+import datetime
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:  # Windows: no getrusage, peak RSS is not reported
+    resource = None
+
+from .frame_io import PngFrames, frame_name
+from .frames import CURSOR_PARAMS, PAPER_PARAMS, remove_cursor, remove_paper_text
+from .framestore import convert_frames
+from .pipeline import clean_frames
+from .sinks import PngSink, StoreSink
+from .text_color import fix_text_color
+from .timeline import render_timeline, retime, timeline_length
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DETAIL_DIR = os.path.join(SCRIPTS_DIR, 'frames')
+SYNTHETIC_SIZE = (460, 320)         # (H, W) of the envelope frames in scripts/processing
+DATASETS = ('synthetic', 'frames')
+STAGES = ('decode', 'cursor', 'paper', 'clean-frames', 'retime', 'retime-motion', 'png-sink', 'store-sink', 'fix-text-color')
+
+
+def _quiet(msg):
+    pass
+
+
+# ============================================
+# Inputs
+# ============================================
+
+def synthetic_frame(k, n, h, w, seed=0):
+    """Deterministic stand-in for an envelope frame: title band, paper with text, cursor early on.
+
+    Frame k of n slides the paper up, so consecutive frames differ like the real clip.
+    """
+    rng = np.random.RandomState(seed)
+    frame = np.empty((h, w, 3), dtype=np.uint8)
+    frame[:] = (226, 220, 212)
+
+    # Rainbow title with dark outlines in the top band (fix-text-color)
+    band = int(h * 0.1)
+    for x0 in range(w // 20, w - w // 10, w // 12):
+        hue = rng.randint(0, 3)
+        color = np.roll(np.array([230, 60, 40], dtype=np.uint8), hue)
+        frame[band // 4:band * 3 // 4, x0:x0 + w // 16] = 40
+        frame[band // 4 + 2:band * 3 // 4 - 2, x0 + 2:x0 + w // 16 - 2] = color
+
+    # Cream paper rising out of the envelope, with dark handwriting strokes
+    lift = int(h * 0.15 * k / max(n - 1, 1))
+    top, bottom = int(h * 0.2) - lift, int(h * 0.6) - lift
+    left, right = int(w * 0.15), int(w * 0.85)
+    frame[top:bottom, left:right] = (245, 240, 232)
+    for _ in range(12):
+        y = rng.randint(top + 4, bottom - 6)
+        x = rng.randint(left + 4, right - w // 4)
+        frame[y:y + max(2, h // 150), x:x + rng.randint(w // 10, w // 4)] = (120, 30, 40)
+
+    # Envelope body in front of the paper
+    frame[int(h * 0.5):, int(w * 0.05):int(w * 0.95)] = (150, 18, 30)
+
+    # Cursor in the centre window during the first third
+    if k < n // 3:
+        cy, cx, r = h // 2, w // 2, max(3, h // 80)
+        frame[cy - r - 1:cy + r + 1, cx - r - 1:cx + r + 1] = (20, 20, 20)
+        frame[cy - r:cy + r, cx - r:cx + r] = 255
+    return frame
+
+
+def prepare_dataset(dataset, scale, limit, work_dir):
+    """Write the dataset's frames at scale as frame_XXXX.png into work_dir. Returns the frame count."""
+    os.makedirs(work_dir, exist_ok=True)
+    if dataset == 'synthetic':
+        h, w = SYNTHETIC_SIZE
+        for k in range(limit):
+            frame = synthetic_frame(k, limit, h * scale, w * scale)
+            Image.fromarray(frame).save(os.path.join(work_dir, frame_name(k + 1)))
+        return limit
+
+    names = sorted(n for n in os.listdir(DETAIL_DIR) if n.endswith('.png'))[:limit]
+    if not names:
+        raise SystemExit(f'No frames found in {DETAIL_DIR}')
+    for k, name in enumerate(names, 1):
+        with Image.open(os.path.join(DETAIL_DIR, name)) as img:
+            img = img.convert('RGB')
+            if scale != 1:
+                img = img.resize((img.width * scale, img.height * scale), Image.LANCZOS)
+            img.save(os.path.join(work_dir, frame_name(k)))
+    return len(names)
+
+
+def bench_timeline(n):
+    """A short timeline over frames 1..n shaped like envelope_open.json."""
+    return {'fps': 60, 'segments': [
+        {'type': 'hold', 'frame': 1, 'frames': 8},
+        {'type': 'retime', 'from': 1, 'to': n, 'frames': n * 2},
+        {'type': 'hold', 'frame': n, 'frames': 8},
+    ]}
+
+
+# ============================================
+# Stages: each takes the frame dir and a scratch dir, runs untimed setup and
+# returns (frames processed, timed callable)
+# ============================================
+
+def _load(frame_dir):
+    source = PngFrames(frame_dir)
+    return [source.read(i) for i in source.numbers()]
+
+
+def _stage_decode(frame_dir, scratch):
+    numbers = PngFrames(frame_dir).numbers()
+    return len(numbers), lambda: _load(frame_dir)
+
+
+def _stage_cursor(frame_dir, scratch):
+    frames = _load(frame_dir)
+
+    def run():
+        for src in frames:
+            remove_cursor(src.astype(np.float32), src, CURSOR_PARAMS)
+    return len(frames), run
+
+
+def _stage_paper(frame_dir, scratch):
+    frames = _load(frame_dir)
+
+    def run():
+        for src in frames:
+            remove_paper_text(src.astype(np.float32), src, PAPER_PARAMS)
+    return len(frames), run
+
+
+def _stage_clean_frames(frame_dir, scratch):
+    n = len(PngFrames(frame_dir).numbers())
+    # Cursor on the first third, paper text on the last third, as in the real clip
+    cursor = dict(CURSOR_PARAMS, last_frame=n // 3)
+    paper = dict(PAPER_PARAMS, first_frame=n - n // 3)
+    out_dir = os.path.join(scratch, 'cleaned')
+    return n, lambda: clean_frames(frame_dir, out_dir, 1, True, cursor, paper, log=_quiet)
+
+
+def _stage_retime(frame_dir, scratch):
+    frames = np.stack(_load(frame_dir))
+    keys = list(range(1, len(frames) + 1))
+    count = len(frames) * 2
+
+    def run():
+        for _ in retime(frames, count, keys):
+            pass
+    return count, run
+
+
+def _stage_retime_motion(frame_dir, scratch):
+    frames = np.stack(_load(frame_dir))
+    keys = list(range(1, len(frames) + 1))
+    count = len(frames) * 2
+
+    def run():
+        for _ in retime(frames, count, keys, interpolate='motion'):
+            pass
+    return count, run
+
+
+def _stage_png_sink(frame_dir, scratch):
+    spec = bench_timeline(len(PngFrames(frame_dir).numbers()))
+    out_dir = os.path.join(scratch, 'final_frames')
+    return timeline_length(spec), lambda: render_timeline(spec, frame_dir, PngSink(out_dir, True), log=_quiet)
+
+
+def _stage_store_sink(frame_dir, scratch):
+    store = os.path.join(scratch, 'source.npy')
+    convert_frames(frame_dir, store, log=_quiet)
+    spec = bench_timeline(len(PngFrames(frame_dir).numbers()))
+    total = timeline_length(spec)
+    out = os.path.join(scratch, 'final.npy')
+    return total, lambda: render_timeline(spec, store, StoreSink(out, total, True), log=_quiet)
+
+
+def _stage_fix_text_color(frame_dir, scratch):
+    frames = _load(frame_dir)
+
+    def run():
+        for src in frames:
+            fix_text_color(src.copy(), log=_quiet)
+    return len(frames), run
+
+
+STAGE_FUNCS = {name: globals()['_stage_' + name.replace('-', '_')] for name in STAGES}
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and KiB elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _run_stage(stage, frame_dir, repeat):
+    """Child-process entry: time one stage repeat times. Returns (frames, [seconds], peak RSS MiB)."""
+    scratch = tempfile.mkdtemp(prefix=f'bench-{stage}-')
+    try:
+        frames, run = STAGE_FUNCS[stage](frame_dir, scratch)
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - start)
+        return frames, times, peak_rss_mb()
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+# ============================================
+# Suite
+# ============================================
+
+def run_suite(datasets=DATASETS, scales=(1, 2, 4), stages=STAGES, limit=24, repeat=3, work_dir=None, log=print):
+    """Run every (dataset, scale, stage) and return the results document."""
+    root = tempfile.mkdtemp(prefix='acscent-bench-', dir=work_dir)
+    spawn = multiprocessing.get_context('spawn')
+    results = []
+    try:
+        for dataset in datasets:
+            for scale in scales:
+                frame_dir = os.path.join(root, f'{dataset}-{scale}x')
+                n = prepare_dataset(dataset, scale, limit, frame_dir)
+                h, w = PngFrames(frame_dir).read(1).shape[:2]
+                log(f'{dataset} {scale}x: {n} frames of {w}x{h}')
+                for stage in stages:
+                    with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+                        frames, times, rss = pool.submit(_run_stage, stage, frame_dir, repeat).result()
+                    best = min(times)
+                    result = {
+                        'dataset': dataset, 'scale': scale, 'stage': stage,
+                        'width': w, 'height': h, 'frames': frames,
+                        'seconds': round(best, 4), 'fps': round(frames / best, 2),
+                        'runs': [round(t, 4) for t in times], 'peak_rss_mb': rss and round(rss, 1),
+                    }
+                    results.append(result)
+                    log(format_result(result))
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    return {
+        'version': 1,
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'machine': {
+            'platform': platform.platform(), 'python': platform.python_version(),
+            'numpy': np.__version__, 'cpu_count': os.cpu_count(),
+        },
+        'limit': limit, 'repeat': repeat,
+        'results': results,
+    }
+
+
+def format_result(r):
+    rss = f'{r["peak_rss_mb"]:8.1f} MiB' if r['peak_rss_mb'] is not None else '       n/a'
+    return (f'  {r["dataset"]:<10} {r["scale"]}x {r["stage"]:<15} {r["frames"]:5d} frames '
+            f'{r["seconds"]:9.3f}s {r["fps"]:9.1f} fps {rss}')
+
+
+def compare(current, previous, threshold=0.10, log=print):
+    """Log the time ratio of every result also present in previous. Returns the regressed results."""
+    before = {(r['dataset'], r['scale'], r['stage']): r for r in previous['results']}
+    regressed = []
+    for r in current['results']:
+        old = before.get((r['dataset'], r['scale'], r['stage']))
+        if old is None or r['frames'] != old['frames']:
+            continue
+        ratio = r['seconds'] / old['seconds'] if old['seconds'] else float('inf')
+        mark = ''
+        if ratio > 1 + threshold:
+            mark = '  SLOWER'
+            regressed.append(r)
+        elif ratio < 1 - threshold:
+            mark = '  faster'
+        log(f'  {r["dataset"]:<10} {r["scale"]}x {r["stage"]:<15} {old["seconds"]:9.3f}s -> '
+            f'{r["seconds"]:9.3f}s  x{ratio:.2f}{mark}')
+    return regressed
+
+
+def save_results(doc, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(doc, f, indent=1)
+        f.write('\n')
@@ -0,0 +1,424 @@
+"""Command line entry point: python -m acscent_media <command> [options]."""
+from PIL import Image
+import numpy as np
+import argparse
+import cProfile
+import json
+import os
+import pstats
+import re
+import sys
+import time
+import tracemalloc
+
+from . import bench, tune
+from .atlas import ATLAS_PARAMS, atlas_budget, pack_atlas, render_atlas
+from .compare import COMPARE_PARAMS, compare_frames, format_frame, summarize
+from .frame_io import MANIFEST
+from .frames import CURSOR_PARAMS, PAPER_PARAMS
+from .framestore import convert_frames, is_store, open_frames
+from .instrument import recording, summary, write_chrome_trace
+from .ops import INPAINT_BACKENDS
+from .optimize import MEDIA_PARAMS, VARIANTS_DIR, largest_variant, optimize_media
+from .pipeline import clean_frames
+from .sinks import CODECS, SINKS, make_sink
+from .temporal import TEMPORAL_PARAMS
+from .text_color import TITLE_PARAMS, fix_text_color
+from .timeline import INTERPOLATIONS, load_timeline, render_timeline, timeline_length
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPO_ROOT = os.path.dirname(SCRIPTS_DIR)
+PROC_DIR = os.path.join(SCRIPTS_DIR, 'processing')
+TIMELINE = os.path.join(SCRIPTS_DIR, 'timelines', 'envelope_open.json')
+IMAGES_DIR = os.path.join(REPO_ROOT, 'public', 'images')
+BACKGROUND = os.path.join(IMAGES_DIR, 'back ground.png')
+# What the envelope animation ships as today, for pack-atlas to compare against
+ENVELOPE_VIDEOS = [os.path.join(IMAGES_DIR, name) for name in ('envelope2_close.mp4', 'envelope2_cropped.mp4')]
+
+# Default output per sink, inside --proc-dir (next to it for a .npy store, see default_output)
+SINK_OUTPUTS = {
+    'png': 'final_frames',
+    'concat': 'final_unique',
+    'raw': 'final_frames.rgb',
+    'ffmpeg': 'final.mp4',
+    'webp': 'final.webp',
+    'store': 'final_frames.npy',
+}
+
+
+def default_output(proc_dir, name):
+    """name inside a PNG frame directory, or <stem>_<name> next to a .npy frame store."""
+    if is_store(proc_dir):
+        stem = os.path.splitext(os.path.basename(proc_dir))[0]
+        return os.path.join(os.path.dirname(proc_dir), f'{stem}_{name}')
+    return os.path.join(proc_dir, name)
+
+
+def cmd_clean_frames(args):
+    out_dir = args.out_dir or default_output(args.proc_dir, 'cleaned.npy' if is_store(args.proc_dir) else 'cleaned')
+    cursor, paper = CURSOR_PARAMS, PAPER_PARAMS
+    if args.inpaint:
+        cursor = dict(cursor, inpaint=args.inpaint)
+        paper = dict(paper, inpaint=args.inpaint)
+    temporal = None
+    if args.temporal:
+        temporal = dict(TEMPORAL_PARAMS)
+        if args.diff_threshold is not None:
+            temporal['diff_threshold'] = args.diff_threshold
+    total, rebuilt = clean_frames(args.proc_dir, out_dir, args.workers, args.force, cursor, paper, temporal)
+    print(f'Done! {rebuilt} rebuilt, {total - rebuilt} unchanged')
+
+
+def cmd_fix_text_color(args):
+    # Load ORIGINAL image (not the already-processed one)
+    with Image.open(args.input) as img:
+        arr = np.array(img)
+    h, w = arr.shape[:2]
+    print(f'Image: {w}x{h}')
+
+    fix_text_color(arr, args.band, radius=args.radius, soft_radius=args.soft_radius)
+
+    output = args.output or os.path.splitext(args.input)[0] + '_green.png'
+    Image.fromarray(arr).save(output)
+    print(f'Done! Saved: {os.path.basename(output)}')
+
+
+def output_size(path):
+    """Bytes written to path: a file, or the frame files of a directory.
+
+    Held frames are hard links to one file, so each inode is counted once, and the
+    directory's manifest is not output.
+    """
+    if os.path.isdir(path):
+        sizes = {}
+        for entry in os.scandir(path):
+            if entry.is_file() and entry.name != MANIFEST:
+                stat = entry.stat()
+                sizes[stat.st_ino] = stat.st_size
+        return sum(sizes.values())
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+def cmd_build_video(args):
+    spec = load_timeline(args.timeline)
+    if args.fps:
+        # Segment durations are in seconds, so a new rate also changes the frame count
+        spec = dict(spec, fps=args.fps)
+    fps = spec.get('fps', 60)
+
+    # Keep stdout clean when raw frames are streamed through it
+    log_stream = sys.stderr if args.output == '-' else sys.stdout
+
+    def log(msg):
+        print(msg, file=log_stream)
+
+    output = args.output or default_output(args.proc_dir, SINK_OUTPUTS[args.sink])
+    sink = make_sink(args.sink, output, fps, args.force, timeline_length(spec), args.codec, args.crf, args.preset,
+                     args.quality, args.lossless)
+    start = time.perf_counter()
+    total = render_timeline(spec, args.proc_dir, sink, args.chunk, log, args.interpolate)
+    elapsed = time.perf_counter() - start
+
+    log(f'Total: {total} frames at {fps:g}fps = {total/fps:.2f}s')
+    if not total:
+        log('Nothing rendered: the timeline has no frames')
+        return
+    if hasattr(sink, 'encoded'):
+        log(f'Frames encoded: {sink.encoded}')
+    if output != '-':
+        size = output_size(output)
+        log(f'Output: {output} ({size / 1024:.1f} KiB, {size * 8 / 1000 / (total / fps):.0f} kbit/s)')
+    log(f'Rendered in {elapsed:.2f}s ({total / elapsed:.1f} frames/s)')
+
+
+def cmd_convert_frames(args):
+    total, written = convert_frames(args.src, args.dst, args.force)
+    print(f'Done! {written} written, {total - written} unchanged')
+
+
+def cmd_pack_atlas(args):
+    params = dict(ATLAS_PARAMS, tile=args.tile, threshold=args.threshold, page_size=args.page_size,
+                  format=args.format, quality=args.quality)
+    proc_dir = args.proc_dir or os.path.join(PROC_DIR, 'final_frames')
+    output = args.output or os.path.join(PROC_DIR, 'atlas')
+    index = pack_atlas(proc_dir, output, args.fps, params)
+
+    if args.verify:
+        source = open_frames(proc_dir)
+        frames = iter(source.read(i)[:, :, :3] for i in source.numbers())
+        worst, total, count = 0, 0.0, 0
+        for duration, frame in render_atlas(output):
+            for _ in range(duration):
+                diff = np.abs(next(frames).astype(np.int16) - frame)
+                worst = max(worst, int(diff.max()))
+                total += float(diff.mean())
+                count += 1
+        print(f'Verified: replay differs from the source by {total / count:.2f} per channel on average, '
+              f'{worst} at most')
+
+    budget = atlas_budget(output, index)
+    duration = sum(f['duration'] for f in index['frames']) / index['fps']
+    print(f'Atlas: {budget["download"] / 1024:.1f} KiB to download ({budget["index"] / 1024:.1f} KiB index), '
+          f'{budget["decoded"] / 1024 / 1024:.1f} MiB decoded, {duration:.2f}s at {index["fps"]:g} fps')
+    for video in args.compare if args.compare is not None else ENVELOPE_VIDEOS:
+        if os.path.exists(video):
+            size = os.path.getsize(video)
+            print(f'  vs {os.path.basename(video)}: {size / 1024:.1f} KiB '
+                  f'(atlas is {budget["download"] / size:.2f}x the bytes)')
+    print(f'Saved: {output}')
+
+
+def cmd_compare_frames(args):
+    params = dict(COMPARE_PARAMS, threshold=args.threshold, sheet_rows=args.sheet_rows, sheet_scale=args.sheet_scale)
+    out_dir = args.out_dir or os.path.join(PROC_DIR, 'compare')
+    results = compare_frames(args.a, args.b, out_dir, args.chunk, not args.no_sheets, params)
+    s = summarize(results)
+    mean_psnr = 'inf' if s['mean_psnr'] is None else f'{s["mean_psnr"]:.2f}'
+    print(f'{s["frames"]} frames ({s["identical"]} identical): mean PSNR {mean_psnr} dB, '
+          f'mean SSIM {s["mean_ssim"]:.4f}, text pixels {s["text_pixels_a"]} -> {s["text_pixels_b"]}')
+    print(f'Least similar {min(args.worst, len(results))} frames:')
+    for r in sorted(results, key=lambda r: r['ssim'])[:args.worst]:
+        print(format_frame(r))
+    print(f'Saved: {out_dir}')
+
+
+def cmd_optimize_media(args):
+    media = dict(MEDIA_PARAMS, widths=args.widths, formats=args.formats,
+                 webp_quality=args.webp_quality, avif_quality=args.avif_quality)
+    print(f'Optimizing {args.images_dir} -> {os.path.join(args.images_dir, VARIANTS_DIR)}')
+    start = time.perf_counter()
+    images = optimize_media(args.images_dir, args.workers, args.force, media)
+    before = sum(entry['bytes'] for entry in images.values())
+    after = sum(largest_variant(entry)['bytes'] for entry in images.values())
+    print(f'Done! {len(images)} images in {time.perf_counter() - start:.1f}s, '
+          f'originals {before / 1024 / 1024:.1f} MiB -> largest variants {after / 1024 / 1024:.1f} MiB')
+
+
+def _csv(kind, choices=None):
+    def parse(text):
+        items = [kind(item) for item in text.split(',') if item]
+        if not items:
+            raise argparse.ArgumentTypeError('expected at least one value')
+        bad = [item for item in items if choices is not None and item not in choices]
+        if bad:
+            raise argparse.ArgumentTypeError(f'unknown {", ".join(map(str, bad))} (choose from {", ".join(choices)})')
+        return items
+    return parse
+
+
+def _grid_item(text):
+    """NAME=V1,V2,... with JSON values; lists such as [80,60,60] keep their commas."""
+    name, sep, values = text.partition('=')
+    if not sep or not values:
+        raise argparse.ArgumentTypeError(f'expected NAME=V1,V2,...: {text!r}')
+    try:
+        return name, [json.loads(v) for v in re.findall(r'\[[^\]]*\]|[^,]+', values)]
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(f'{text!r}: {e}')
+
+
+def cmd_tune(args):
+    source = args.source or (BACKGROUND if args.target == 'title' else PROC_DIR)
+    cache_dir = args.cache_dir or os.path.join(PROC_DIR, 'tune_cache')
+    path = tune.build_features(args.target, source, cache_dir)
+    grid = dict(args.grid or [])
+    start = time.perf_counter()
+    rows = tune.sweep(args.target, path, grid, workers=args.workers)
+    elapsed = time.perf_counter() - start
+    print(f'{len(rows)} combinations in {elapsed:.2f}s (* = current defaults, iou against the defaults\' masks)')
+    for line in tune.format_table(args.target, grid, rows, tune.TARGETS[args.target]['params']):
+        print(line)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'target': args.target, 'source': source, 'grid': grid,
+                       'results': [dict(values, **stats) for values, stats in rows]}, f, indent=1)
+            f.write('\n')
+        print(f'Saved: {args.output}')
+
+
+def cmd_bench(args):
+    doc = bench.run_suite(args.datasets, args.scales, args.stages, args.limit, args.repeat, args.work_dir)
+    bench.save_results(doc, args.output)
+    print(f'Saved: {args.output}')
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            previous = json.load(f)
+        print(f'Compared with {args.compare}:')
+        if bench.compare(doc, previous, args.threshold):
+            return 1
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='acscent_media', description='AC\'SCENT media processing tools')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    # Instrumentation switches shared by the pipeline commands (see instrument.py)
+    common = argparse.ArgumentParser(add_help=False)
+    group = common.add_argument_group('instrumentation')
+    group.add_argument('--trace', metavar='PATH', help='record per-step spans and write them as Chrome-trace JSON')
+    group.add_argument('--profile', metavar='PATH',
+                       help='run under cProfile and save the stats (this process only: use --workers 1)')
+    group.add_argument('--tracemalloc', action='store_true', help='track Python allocations per span')
+
+    p = commands.add_parser('clean-frames', parents=[common], help='remove cursor and letter-paper text from envelope frames')
+    p.add_argument('--proc-dir', default=PROC_DIR, help='directory holding frame_XXXX.png, or a .npy frame store')
+    p.add_argument('--out-dir', help='output directory or .npy frame store '
+                        '(default: <proc-dir>/cleaned, or <stem>_cleaned.npy next to a .npy store)')
+    p.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                   help='worker processes (1 = run serially in this process)')
+    p.add_argument('--force', action='store_true', help='ignore the manifest and rebuild every frame')
+    p.add_argument('--inpaint', choices=sorted(INPAINT_BACKENDS),
+                   help='fill backend for cursor and paper text (default: blur)')
+    p.add_argument('--temporal', action='store_true',
+                   help='track paper/text masks across frames and reuse the clean plate where static')
+    p.add_argument('--diff-threshold', type=int,
+                   help=f'temporal: per-channel change that counts as motion '
+                        f'(default: {TEMPORAL_PARAMS["diff_threshold"]})')
+    p.set_defaults(func=cmd_clean_frames)
+
+    p = commands.add_parser('fix-text-color', parents=[common], help='recolor the background title green with a white outline')
+    p.add_argument('--input', default=BACKGROUND, help='source background image')
+    p.add_argument('--output', help='output image (default: <input>_green.png)')
+    p.add_argument('--band', type=float, default=0.12, help='fraction of the height holding the title')
+    p.add_argument('--radius', type=float, default=TITLE_PARAMS['radius'], help='hard outline width in px')
+    p.add_argument('--soft-radius', type=float, default=TITLE_PARAMS['soft_radius'], help='outer edge of the outline falloff in px')
+    p.set_defaults(func=cmd_fix_text_color)
+
+    p = commands.add_parser('build-video', parents=[common], help='render an envelope animation timeline')
+    p.add_argument('--proc-dir', default=PROC_DIR, help='directory holding source frame_XXXX.png, or a .npy frame store')
+    p.add_argument('--timeline', default=TIMELINE, help='timeline spec (.json, or .yaml with PyYAML)')
+    p.add_argument('--sink', choices=SINKS, default='png',
+                   help='png: numbered frames, concat: unique frames + ffconcat durations, '
+                        'raw: rgb24 stream, ffmpeg: encoded video, webp: animated WebP (Pillow), '
+                        'store: .npy frame store')
+    p.add_argument('--output', help="output dir (png/concat) or file ('-' = stdout for raw); default: inside <proc-dir>, "
+                        "or <stem>_<output> next to a .npy store")
+    p.add_argument('--chunk', type=int, default=16, help='target frames blended per vectorized batch')
+    p.add_argument('--interpolate', choices=INTERPOLATIONS, default='blend',
+                   help='in-between frames of retime/reverse/crossfade segments that do not set "interpolate": '
+                        'blend neighbouring frames, or motion-compensated (slower, no ghosting)')
+    p.add_argument('--fps', type=float, help='output frame rate (default: the timeline\'s fps)')
+    p.add_argument('--codec', choices=sorted(CODECS),
+                   help='ffmpeg: video codec (default: vp9 for .webm, otherwise h264)')
+    p.add_argument('--crf', type=int, help='ffmpeg: constant rate factor, lower is larger and sharper '
+                                          '(default per codec)')
+    p.add_argument('--preset', help='ffmpeg: encoder speed preset (default per codec)')
+    p.add_argument('--quality', type=int, default=80, help='webp: quality 0-100')
+    p.add_argument('--lossless', action='store_true', help='webp: encode losslessly')
+    p.add_argument('--force', action='store_true', help='rewrite every png/store frame, ignoring the manifest')
+    p.set_defaults(func=cmd_build_video)
+
+    p = commands.add_parser('convert-frames', parents=[common], help='pack PNG frames into a .npy frame store, or export one to PNGs')
+    p.add_argument('src', help='directory of frame_XXXX.png or .npy frame store')
+    p.add_argument('dst', help='output .npy frame store or directory')
+    p.add_argument('--force', action='store_true', help='rewrite frames whose build key already matches')
+    p.set_defaults(func=cmd_convert_frames)
+
+    p = commands.add_parser('pack-atlas', help='pack rendered frames into a sprite atlas of changed tiles for canvas playback')
+    p.add_argument('--proc-dir', help='frames to pack (default: <processing>/final_frames), or a .npy frame store')
+    p.add_argument('--output', help='directory for atlas pages and index.json (default: <processing>/atlas)')
+    p.add_argument('--fps', type=float, default=60, help='playback rate written to the index')
+    p.add_argument('--tile', type=int, default=ATLAS_PARAMS['tile'], help='tile edge in px')
+    p.add_argument('--threshold', type=int, default=ATLAS_PARAMS['threshold'],
+                   help='per-channel change ignored when looking for changed tiles (0 = exact)')
+    p.add_argument('--page-size', type=int, default=ATLAS_PARAMS['page_size'], help='atlas page edge in px')
+    p.add_argument('--format', choices=('webp', 'png'), default=ATLAS_PARAMS['format'], help='atlas page format')
+    p.add_argument('--quality', type=int, help='webp: lossy quality 0-100 (default: lossless)')
+    p.add_argument('--compare', action='append', metavar='VIDEO',
+                   help='video to compare the byte budget with (default: the envelope MP4s in public/images)')
+    p.add_argument('--verify', action='store_true', help='replay the index and check it against the source frames')
+    p.set_defaults(func=cmd_pack_atlas)
+
+    p = commands.add_parser('compare-frames', parents=[common],
+                            help='PSNR/SSIM, change heatmaps and contact sheets for two frame sequences')
+    p.add_argument('a', help='reference frames: directory of frame_XXXX.png or .npy frame store')
+    p.add_argument('b', help='frames to compare, e.g. processing/cleaned')
+    p.add_argument('--out-dir', help='where compare.json, heatmaps and sheets go (default: <processing>/compare)')
+    p.add_argument('--chunk', type=int, default=16, help='frames compared per vectorized batch')
+    p.add_argument('--threshold', type=int, default=COMPARE_PARAMS['threshold'],
+                   help='per-channel difference that counts as a changed pixel')
+    p.add_argument('--worst', type=int, default=5, help='least similar frames to list')
+    p.add_argument('--sheet-rows', type=int, default=COMPARE_PARAMS['sheet_rows'], help='frames per contact sheet')
+    p.add_argument('--sheet-scale', type=float, default=COMPARE_PARAMS['sheet_scale'], help='contact sheet tile scale')
+    p.add_argument('--no-sheets', action='store_true', help='skip the contact sheets')
+    p.set_defaults(func=cmd_compare_frames)
+
+    p = commands.add_parser('optimize-media', help='write WebP/AVIF width variants of public/images and a manifest')
+    p.add_argument('--images-dir', default=IMAGES_DIR, help='source images; variants go to <images-dir>/variants')
+    p.add_argument('--widths', type=_csv(int), default=MEDIA_PARAMS['widths'],
+                   help='comma-separated target widths, capped at each source\'s own width')
+    p.add_argument('--formats', type=_csv(str, ('webp', 'avif')), default=MEDIA_PARAMS['formats'],
+                   help='comma-separated: webp, avif')
+    p.add_argument('--webp-quality', type=int, default=MEDIA_PARAMS['webp_quality'], help='WebP quality 0-100')
+    p.add_argument('--avif-quality', type=int, default=MEDIA_PARAMS['avif_quality'], help='AVIF quality 0-100')
+    p.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                   help='worker processes (1 = run serially in this process)')
+    p.add_argument('--force', action='store_true', help='re-encode every image, ignoring the manifest')
+    p.set_defaults(func=cmd_optimize_media)
+
+    p = commands.add_parser('tune', help='sweep mask thresholds over cached per-frame features')
+    p.add_argument('target', choices=sorted(tune.TARGETS), help='cursor / paper: clean-frames masks, '
+                                                                'title: fix-text-color text mask')
+    p.add_argument('--source', help='frames (cursor, paper; default: processing) or image (title; '
+                                    'default: the background art)')
+    p.add_argument('--grid', type=_grid_item, action='append', metavar='NAME=V1,V2',
+                   help='values to try for one parameter; repeat for a full grid')
+    p.add_argument('--cache-dir', help='feature cache (default: <processing>/tune_cache)')
+    p.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='worker processes')
+    p.add_argument('--output', help='write every combination\'s statistics as JSON')
+    p.set_defaults(func=cmd_tune)
+
+    p = commands.add_parser('bench', help='time every stage on synthetic and checked-in frames at several scales')
+    p.add_argument('--output', default='bench.json', help='results JSON')
+    p.add_argument('--datasets', type=_csv(str, bench.DATASETS), default=list(bench.DATASETS),
+                   help='comma-separated: synthetic, frames (scripts/frames/*.png)')
+    p.add_argument('--scales', type=_csv(int), default=[1, 2, 4], help='comma-separated resolution multipliers')
+    p.add_argument('--stages', type=_csv(str, bench.STAGES), default=list(bench.STAGES),
+                   help=f'comma-separated subset of: {", ".join(bench.STAGES)}')
+    p.add_argument('--limit', type=int, default=24, help='frames per dataset')
+    p.add_argument('--repeat', type=int, default=3, help='timed runs per stage; the fastest is reported')
+    p.add_argument('--work-dir', help='where scaled inputs are written (default: system temp)')
+    p.add_argument('--compare', help='previous results JSON; exits 1 if any stage got slower')
+    p.add_argument('--threshold', type=float, default=0.10, help='relative slowdown that counts as a regression')
+    p.set_defaults(func=cmd_bench)
+
+    return parser
+
+
+def run_instrumented(args):
+    """Run the command under a span recorder, then report to stderr (stdout may carry raw frames)."""
+    with recording(memory=args.tracemalloc) as rec:
+        if args.profile:
+            profiler = cProfile.Profile()
+            code = profiler.runcall(args.func, args)
+        else:
+            code = args.func(args)
+        if args.tracemalloc:
+            peak = tracemalloc.get_traced_memory()[1]
+
+    err = sys.stderr
+    print('', file=err)
+    for line in summary(rec.events):
+        print(line, file=err)
+    if args.trace:
+        write_chrome_trace(rec.events, args.trace)
+        print(f'\nTrace: {args.trace} ({len(rec.events)} spans)', file=err)
+    if args.profile:
+        profiler.dump_stats(args.profile)
+        print(f'\nProfile: {args.profile}, top functions by cumulative time:', file=err)
+        pstats.Stats(profiler, stream=err).sort_stats('cumulative').print_stats(15)
+    if args.tracemalloc:
+        print(f'\nPython allocations peak: {peak / 1024 / 1024:.1f} MiB; spans that raised it most:', file=err)
+        raised = sorted(rec.events, key=lambda e: -e['args']['peak_gain_kb'])[:10]
+        for e in raised:
+            if e['args']['peak_gain_kb'] > 0:
+                at = f' (frame {e["args"]["frame"]})' if 'frame' in e['args'] else ''
+                print(f'  {e["name"]}{at}: +{e["args"]["peak_gain_kb"] / 1024:.1f} MiB', file=err)
+    return code
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if getattr(args, 'trace', None) or getattr(args, 'profile', None) or getattr(args, 'tracemalloc', False):
+        return run_instrumented(args) or 0
+    return args.func(args) or 0
@@ -0,0 +1,202 @@
+"""Numerical comparison of two frame sequences, e.g. the raw frames against cleaned/.
+
+    python -m acscent_media compare-frames processing processing/cleaned
+
+Frames are compared a chunk at a time as (N, H, W, 3) stacks, so memory stays
+bounded however long the clip is. Per frame: PSNR, SSIM (Gaussian window on
+luma), the pixels that changed, and how much paper text is still detected in
+each sequence. Over the whole clip: a heatmap of how often each pixel changed,
+a heatmap of where text survives in the second sequence, and contact sheets
+with [a | b | amplified difference] rows, all written as the chunks stream by.
+"""
+from PIL import Image, ImageDraw
+import numpy as np
+from scipy.ndimage import gaussian_filter
+import json
+import os
+
+from .frame_io import frame_name
+from .frames import PAPER_PARAMS, detect_paper_text, paper_box
+from .framestore import open_frames
+from .instrument import span
+
+COMPARE_PARAMS = {
+    'threshold': 8,             # per-channel difference that counts as a changed pixel
+    'ssim_sigma': 1.5,
+    'diff_gain': 4,             # amplification of |a - b| on the contact sheets
+    'sheet_rows': 10,
+    'sheet_scale': 0.5,
+}
+
+LUMA = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+SSIM_C1 = (0.01 * 255) ** 2
+SSIM_C2 = (0.03 * 255) ** 2
+
+# Black -> red -> yellow -> white
+HEAT_STOPS = np.array([0, 1 / 3, 2 / 3, 1])
+HEAT_COLORS = np.array([[0, 0, 0], [200, 0, 0], [255, 220, 0], [255, 255, 255]], dtype=np.float32)
+
+
+def psnr(a, b):
+    """PSNR in dB of each frame of two float (N, H, W, 3) stacks; inf where identical."""
+    mse = np.mean((a - b) ** 2, axis=(1, 2, 3))
+    with np.errstate(divide='ignore'):
+        return 10 * np.log10(255.0 ** 2 / mse)
+
+
+def ssim(a, b, sigma=1.5):
+    """Mean SSIM of each frame of two float (N, H, W, 3) stacks, computed on luma."""
+    ya, yb = a @ LUMA, b @ LUMA
+    window = (0, sigma, sigma)      # blur each frame, never across frames
+
+    def blur(x):
+        return gaussian_filter(x, window, mode='reflect')
+
+    mu_a, mu_b = blur(ya), blur(yb)
+    var_a = blur(ya * ya) - mu_a * mu_a
+    var_b = blur(yb * yb) - mu_b * mu_b
+    cov = blur(ya * yb) - mu_a * mu_b
+    ssim_map = ((2 * mu_a * mu_b + SSIM_C1) * (2 * cov + SSIM_C2) /
+                ((mu_a * mu_a + mu_b * mu_b + SSIM_C1) * (var_a + var_b + SSIM_C2)))
+    return ssim_map.mean(axis=(1, 2))
+
+
+def heat_colors(values):
+    """RGB uint8 heatmap of values in [0, 1]."""
+    values = np.clip(values, 0, 1)
+    rgb = [np.interp(values, HEAT_STOPS, HEAT_COLORS[:, c]) for c in range(3)]
+    return np.stack(rgb, axis=-1).astype(np.uint8)
+
+
+def text_pixels(frame, paper=PAPER_PARAMS):
+    """Paper-text mask of a uint8 frame over its paper box, or None when there is no paper."""
+    top, bottom, left, right = paper_box(frame.shape, paper)
+    _, text_mask, _ = detect_paper_text(frame[top:bottom, left:right].astype(np.float32), paper)
+    return text_mask
+
+
+class ContactSheets:
+    """[a | b | diff] rows, saved as sheet_<first>-<last>.png every `rows` frames."""
+
+    def __init__(self, out_dir, rows, scale):
+        self.out_dir = out_dir
+        self.rows = rows
+        self.scale = scale
+        self.pending = []
+        self.saved = []
+
+    def _tile(self, frame):
+        img = Image.fromarray(frame)
+        if self.scale != 1:
+            img = img.resize((max(1, round(img.width * self.scale)), max(1, round(img.height * self.scale))),
+                             Image.BILINEAR)
+        return img
+
+    def add(self, i, a, b, diff):
+        tiles = [self._tile(a), self._tile(b), self._tile(diff)]
+        row = Image.new('RGB', (sum(t.width for t in tiles), tiles[0].height))
+        x = 0
+        for t in tiles:
+            row.paste(t, (x, 0))
+            x += t.width
+        ImageDraw.Draw(row).text((4, 2), str(i), fill=(255, 255, 0))
+        self.pending.append((i, row))
+        if len(self.pending) == self.rows:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        rows = [row for _, row in self.pending]
+        sheet = Image.new('RGB', (rows[0].width, sum(r.height for r in rows)))
+        for k, row in enumerate(rows):
+            sheet.paste(row, (0, k * row.height))
+        path = os.path.join(self.out_dir, f'sheet_{self.pending[0][0]:04d}-{self.pending[-1][0]:04d}.png')
+        sheet.save(path)
+        self.saved.append(path)
+        self.pending = []
+
+
+def compare_frames(a_path, b_path, out_dir, chunk=16, sheets=True, params=COMPARE_PARAMS,
+                   paper=PAPER_PARAMS, log=print):
+    """Compare the frames both sequences hold. Writes compare.json, heatmaps and
+    contact sheets into out_dir and returns the per-frame results."""
+    a_frames, b_frames = open_frames(a_path), open_frames(b_path)
+    numbers = [i for i in a_frames.numbers() if i in b_frames]
+    if not numbers:
+        raise SystemExit(f'No frame numbers in common between {a_path} and {b_path}')
+    shape = a_frames.read(numbers[0]).shape
+    if b_frames.read(numbers[0]).shape != shape:
+        raise SystemExit(f'Frame sizes differ: {shape} vs {b_frames.read(numbers[0]).shape}')
+
+    os.makedirs(out_dir, exist_ok=True)
+    changed_heat = np.zeros(shape[:2], dtype=np.int32)
+    residual_heat = np.zeros(shape[:2], dtype=np.int32)
+    top, bottom, left, right = paper_box(shape, paper)
+    sheet = ContactSheets(out_dir, params['sheet_rows'], params['sheet_scale']) if sheets else None
+    results = []
+
+    for start in range(0, len(numbers), chunk):
+        batch = numbers[start:start + chunk]
+        with span('compare.chunk', frames=len(batch)):
+            a_u8 = np.stack([a_frames.read(i) for i in batch])
+            b_u8 = np.stack([b_frames.read(i) for i in batch])
+            a, b = a_u8.astype(np.float32), b_u8.astype(np.float32)
+            absdiff = np.abs(a - b)
+            channel_max = absdiff.max(axis=3)
+            changed = channel_max > params['threshold']
+            changed_heat += changed.sum(axis=0, dtype=np.int32)
+            frame_psnr = psnr(a, b)
+            frame_ssim = ssim(a, b, params['ssim_sigma'])
+
+        for k, i in enumerate(batch):
+            with span('compare.text', frame=i):
+                text_a = text_pixels(a_u8[k], paper)
+                text_b = text_pixels(b_u8[k], paper)
+            if text_b is not None:
+                residual_heat[top:bottom, left:right] += text_b
+            results.append({
+                'frame': i,
+                'psnr': None if np.isinf(frame_psnr[k]) else round(float(frame_psnr[k]), 3),
+                'ssim': round(float(frame_ssim[k]), 5),
+                'changed_pixels': int(np.count_nonzero(changed[k])),
+                'max_diff': int(channel_max[k].max()),
+                'text_pixels_a': 0 if text_a is None else int(np.count_nonzero(text_a)),
+                'text_pixels_b': 0 if text_b is None else int(np.count_nonzero(text_b)),
+            })
+            if sheet is not None:
+                diff = heat_colors(channel_max[k] * params['diff_gain'] / 255)
+                sheet.add(i, a_u8[k], b_u8[k], diff)
+        log(f'Compared {min(start + chunk, len(numbers))}/{len(numbers)}')
+
+    if sheet is not None:
+        sheet.flush()
+    Image.fromarray(heat_colors(changed_heat / len(numbers))).save(os.path.join(out_dir, 'heat_changed.png'))
+    Image.fromarray(heat_colors(residual_heat / len(numbers))).save(os.path.join(out_dir, 'heat_residual_text.png'))
+
+    doc = {'version': 1, 'a': a_path, 'b': b_path, 'params': params, 'summary': summarize(results),
+           'frames': results}
+    with open(os.path.join(out_dir, 'compare.json'), 'w', encoding='utf-8') as f:
+        json.dump(doc, f, indent=1)
+        f.write('\n')
+    return results
+
+
+def summarize(results):
+    finite = [r['psnr'] for r in results if r['psnr'] is not None]
+    return {
+        'frames': len(results),
+        'identical': sum(r['psnr'] is None for r in results),
+        'mean_psnr': round(float(np.mean(finite)), 3) if finite else None,
+        'min_psnr': min(finite) if finite else None,
+        'mean_ssim': round(float(np.mean([r['ssim'] for r in results])), 5),
+        'min_ssim': min(r['ssim'] for r in results),
+        'text_pixels_a': sum(r['text_pixels_a'] for r in results),
+        'text_pixels_b': sum(r['text_pixels_b'] for r in results),
+    }
+
+
+def format_frame(r):
+    db = 'inf' if r['psnr'] is None else f'{r["psnr"]:.2f}'
+    return (f'  {frame_name(r["frame"])}: PSNR {db:>6} dB  SSIM {r["ssim"]:.4f}  '
+            f'changed {r["changed_pixels"]:6d} px  text {r["text_pixels_a"]:5d} -> {r["text_pixels_b"]:5d} px')
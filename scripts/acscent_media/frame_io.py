@@ -0,0 +1,89 @@
+"""Frame files on disk: naming, decoding, the incremental-build manifest and PNG frame directories."""
+from PIL import Image
+import numpy as np
+import json
+import os
+import re
+
+FRAME_PATTERN = re.compile(r'frame_(\d{4})\.png')
+MANIFEST = 'manifest.json'
+
+
+def frame_name(i):
+    return f'frame_{i:04d}.png'
+
+
+def read_frame(frame_dir, i):
+    """Decode frame i as a uint8 (H, W, 3) RGB array."""
+    with Image.open(os.path.join(frame_dir, frame_name(i))) as img:
+        return np.asarray(img.convert('RGB'))
+
+
+def list_frames(frame_dir):
+    """Frame numbers found in frame_dir, sorted so output order never depends on the filesystem."""
+    numbers = []
+    for name in os.listdir(frame_dir):
+        m = FRAME_PATTERN.fullmatch(name)
+        if m:
+            numbers.append(int(m.group(1)))
+    return sorted(numbers)
+
+
+def load_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, MANIFEST), encoding='utf-8') as f:
+            return json.load(f)['frames']
+    except (OSError, ValueError, KeyError):
+        return {}
+
+
+def save_manifest(out_dir, frames):
+    path = os.path.join(out_dir, MANIFEST)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump({'version': 1, 'frames': frames}, f, indent=1, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+
+class PngFrames:
+    """A directory of frame_XXXX.png files, read and written one frame at a time.
+
+    Shares its interface with framestore.FrameStore so every stage accepts either.
+    """
+
+    def __init__(self, frame_dir):
+        self.path = frame_dir
+
+    def numbers(self):
+        return list_frames(self.path)
+
+    def __contains__(self, i):
+        return os.path.exists(os.path.join(self.path, frame_name(i)))
+
+    def read(self, i):
+        return read_frame(self.path, i)
+
+    def read_range(self, first, last):
+        """Decode frames first..last once into a single uint8 (N, H, W, 3) array."""
+        head = self.read(first)
+        frames = np.empty((last - first + 1,) + head.shape, dtype=np.uint8)
+        frames[0] = head
+        for k in range(1, len(frames)):
+            frames[k] = self.read(first + k)
+        return frames
+
+    def frame_bytes(self, i):
+        """Bytes identifying frame i for content hashing: the encoded file."""
+        with open(os.path.join(self.path, frame_name(i)), 'rb') as f:
+            return f.read()
+
+    def write(self, i, frame):
+        Image.fromarray(frame).save(os.path.join(self.path, frame_name(i)))
+
+    def load_keys(self):
+        return load_manifest(self.path)
+
+    def finish(self, numbers, keys):
+        """Save the manifest and drop frame files other than numbers."""
+        for i in set(list_frames(self.path)) - set(numbers):
+            os.remove(os.path.join(self.path, frame_name(i)))
+        save_manifest(self.path, keys)
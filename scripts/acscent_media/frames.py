@@ -0,0 +1,231 @@
+"""Envelope frame cleanup: cursor removal (early frames) and letter-paper text removal (late frames)."""
+import numpy as np
+import hashlib
+import json
+
+from .frame_io import frame_name
+from .framestore import open_frames
+from .instrument import active, note, recording, span
+from .ops import channel_mask, grow_mask, inpaint
+
+# Cursor removal (frames 1 ~ last_frame)
+CURSOR_PARAMS = {
+    'last_frame': 20,
+    'white_min': 200,               # cursor body: all channels above this
+    'border_max': [80, 60, 60],     # cursor outline: R, G, B below these
+    'count_min': 5,
+    'count_max': 800,
+    'blur_radius': 8,
+    'dilate_iterations': 2,
+    'inpaint': 'blur',              # see ops.INPAINT_BACKENDS
+}
+
+# Letter-paper text removal (frames first_frame+)
+PAPER_PARAMS = {
+    'first_frame': 60,
+    'bottom': 0.62,                 # paper occupies the top 62% of the frame
+    'margin': 10,
+    'min_paper_pixels': 500,
+    'dark_offset': 15,
+    'color_dist': 18,
+    'dark_brightness': 180,
+    'dark_color_dist': 10,
+    'min_text_pixels': 100,
+    'blur_radius': 25,
+    'dilate_iterations': 3,
+    'inpaint': 'blur',
+}
+
+
+def remove_cursor(arr, src, cursor=CURSOR_PARAMS):
+    """Inpaint the mouse cursor in the central search window of a float (H, W, C) frame.
+
+    src is the untouched uint8 frame the fill is taken from.
+    """
+    h, w = arr.shape[:2]
+    # Cursor is white/light on red envelope, center area
+    cy_start, cy_end = h // 3, h * 2 // 3
+    cx_start, cx_end = w // 4, w * 3 // 4
+
+    with span('cursor.detect'):
+        region = arr[cy_start:cy_end, cx_start:cx_end]
+        # White pixels in red zone
+        white = cursor['white_min']
+        is_cursor = channel_mask(region, above=(white, white, white))
+        # Also catch cursor border (dark outline on red)
+        is_cursor |= channel_mask(region, below=cursor['border_max'])
+
+        # Only if small cluster (cursor sized)
+        cursor_count = np.count_nonzero(is_cursor)
+    note(cursor_pixels=cursor_count)
+    if not cursor['count_min'] < cursor_count < cursor['count_max']:
+        return arr
+
+    cursor_full = np.zeros((h, w), dtype=bool)
+    cursor_full[cy_start:cy_end, cx_start:cx_end] = is_cursor
+    # Dilate the cursor mask slightly
+    grow_mask(cursor_full, cursor['dilate_iterations'])
+    # Fill from a heavily blurred version of the frame, around the cursor only
+    return inpaint(arr, src, cursor_full, cursor['blur_radius'], cursor['inpaint'])
+
+
+def paper_box(shape, paper=PAPER_PARAMS):
+    """(top, bottom, left, right) of the region the letter paper can occupy."""
+    h, w = shape[:2]
+    # Define paper region: upper portion of frame
+    return 0, int(h * paper['bottom']), paper['margin'], w - paper['margin']
+
+
+def paper_pixels(paper_region):
+    """Mask of the cream letter paper in an RGB crop of the paper region."""
+    # Detect paper area (cream/white, excluding envelope red and background beige)
+    # Paper is bright and relatively neutral (not red like envelope)
+    is_paper = channel_mask(paper_region, above=(200, 190, 180), below=(255, np.inf, np.inf))
+    is_paper &= paper_region[:, :, 1] - paper_region[:, :, 2] < 30  # not too warm
+    return is_paper
+
+
+def paper_features(paper_region, paper_avg):
+    """Per-pixel (brightness, RGB distance from paper_avg, green above 50) of the crop."""
+    brightness = np.mean(paper_region, axis=2)
+    color_dist = np.sqrt(np.sum((paper_region - paper_avg) ** 2, axis=2))
+    return brightness, color_dist, paper_region[:, :, 1] > 50
+
+
+def threshold_paper_text(is_paper, brightness, color_dist, green, paper_level, paper=PAPER_PARAMS):
+    """Text mask from paper_features; paper_level is the mean of the paper colour."""
+    # Detect text: pixels on paper that are darker than paper
+    # Text is dark red/maroon on cream
+    is_dark_on_paper = brightness < paper_level - paper['dark_offset']
+
+    # Combine: anything on the paper area that's not clean paper
+    # Use color distance from paper average
+    is_text_area = (color_dist > paper['color_dist']) | is_dark_on_paper
+
+    # Only within actual paper bounds (not envelope edges)
+    text_mask = is_text_area & is_paper
+
+    # Also catch text that's darker than paper threshold
+    dark_text = (brightness < paper['dark_brightness']) & green
+    text_mask |= dark_text & (color_dist > paper['dark_color_dist'])
+    return text_mask
+
+
+def detect_paper_text(paper_region, paper=PAPER_PARAMS, paper_avg=None):
+    """Paper and raw text masks for an RGB crop of the paper region.
+
+    paper_avg is measured from the crop unless given. Returns (is_paper, text_mask,
+    paper_avg); text_mask and paper_avg are None when there is too little paper.
+    """
+    is_paper = paper_pixels(paper_region)
+    if paper_avg is None:
+        if np.count_nonzero(is_paper) <= paper['min_paper_pixels']:
+            return is_paper, None, None
+        # Get average paper color
+        paper_avg = np.mean(paper_region[is_paper], axis=0)
+
+    brightness, color_dist, green = paper_features(paper_region, paper_avg)
+    text_mask = threshold_paper_text(is_paper, brightness, color_dist, green, np.mean(paper_avg), paper)
+    return is_paper, text_mask, paper_avg
+
+
+def paper_text_mask(shape, is_paper, text_mask, paper=PAPER_PARAMS):
+    """Full-frame (inpaint mask, paper mask) from the region masks of detect_paper_text."""
+    top, bottom, left, right = paper_box(shape, paper)
+    full_mask = np.zeros(shape[:2], dtype=bool)
+    full_mask[top:bottom, left:right] = text_mask
+    # Dilate to catch anti-aliased edges
+    grow_mask(full_mask, paper['dilate_iterations'])
+    # Keep within paper bounds
+    paper_full = np.zeros(shape[:2], dtype=bool)
+    paper_full[top:bottom, left:right] = is_paper
+    full_mask &= paper_full
+    return full_mask, paper_full
+
+
+def remove_paper_text(arr, src, paper=PAPER_PARAMS):
+    """Inpaint the handwriting on the letter paper of a float (H, W, C) frame.
+
+    src is the untouched uint8 frame the fill is taken from.
+    """
+    top, bottom, left, right = paper_box(arr.shape, paper)
+    with span('paper.detect'):
+        is_paper, text_mask, _ = detect_paper_text(arr[top:bottom, left:right, :3], paper)
+        text_count = np.count_nonzero(text_mask) if text_mask is not None else 0
+    note(paper_pixels=int(np.count_nonzero(is_paper)), text_pixels=text_count)
+    if text_mask is None or text_count <= paper['min_text_pixels']:
+        return arr
+
+    full_mask, paper_full = paper_text_mask(arr.shape, is_paper, text_mask, paper)
+    # Apply very heavily blurred paper where text was detected, on the text's tile only
+    return inpaint(arr, src, full_mask, paper['blur_radius'], paper['inpaint'], domain=paper_full)
+
+
+def clean_frame(i, source, target, cursor=CURSOR_PARAMS, paper=PAPER_PARAMS, tracker=None):
+    """Clean frame i of source into target (PNG directories or frame stores).
+
+    With a temporal.PaperTracker, paper text removal goes through it.
+    """
+    with span('frame', frame=i):
+        with span('decode'):
+            src = source.read(i)
+            arr = src.astype(np.float32)
+
+        if i <= cursor['last_frame']:
+            with span('cursor'):
+                remove_cursor(arr, src, cursor)
+        if tracker is not None:
+            with span('paper'):
+                tracker.clean(arr, src)
+        elif i >= paper['first_frame']:
+            with span('paper'):
+                remove_paper_text(arr, src, paper)
+
+        with span('encode'):
+            target.write(i, arr.astype(np.uint8))
+    return frame_name(i)
+
+
+def frame_key(i, source, cursor=CURSOR_PARAMS, paper=PAPER_PARAMS, temporal=None, prev_key=None):
+    """Hash of the source file plus the parameters of every stage that applies to frame i.
+
+    The frame-range bounds only decide which stages apply, so moving them only
+    invalidates the frames that enter or leave a stage. Temporally tracked frames
+    also depend on the previous frame, so they chain in its key.
+    """
+    stages = {}
+    if i <= cursor['last_frame']:
+        stages['cursor'] = {k: v for k, v in cursor.items() if k != 'last_frame'}
+    if i >= paper['first_frame']:
+        stages['paper'] = {k: v for k, v in paper.items() if k != 'first_frame'}
+    if temporal is not None:
+        stages['temporal'] = temporal
+        stages['prev'] = prev_key
+
+    digest = hashlib.sha256()
+    digest.update(source.frame_bytes(i))
+    digest.update(json.dumps(stages, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def _clean_frame_job(job):
+    """Pool entry point. Returns (name, key, rebuilt, trace events or None).
+
+    trace is None or the recording() arguments of the parent (see
+    instrument.worker_recording). In a worker process, spans are then recorded
+    locally, with the same memory tracking, and returned for the parent to merge;
+    in the parent's own process they go straight to its active recorder.
+    """
+    i, src_path, out_path, cached_key, cursor, paper, trace = job
+    if trace is not None and not active():
+        with recording(**trace) as rec:
+            return _clean_frame_job(job[:-1] + (None,))[:3] + (rec.events,)
+
+    # Sources are opened per job: mapping a store is cheap and keeps jobs picklable
+    source, target = open_frames(src_path), open_frames(out_path, 'r+')
+    fname = frame_name(i)
+    key = frame_key(i, source, cursor, paper)
+    if key == cached_key and i in target:
+        return fname, key, False, None
+    clean_frame(i, source, target, cursor, paper)
+    return fname, key, True, None
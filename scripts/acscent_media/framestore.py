@@ -0,0 +1,157 @@
+"""Memory-mapped frame store: one uint8 (N, H, W, 3) .npy file plus a JSON header.
+
+A store replaces a directory of PNGs between stages. Frames are read as views
+of a numpy.memmap and written in place, so chaining clean-frames and
+build-video costs no zlib work; PNGs are only exported at the end:
+    python -m acscent_media convert-frames processing processing.npy
+    python -m acscent_media clean-frames --proc-dir processing.npy --out-dir cleaned.npy
+    python -m acscent_media build-video --proc-dir cleaned.npy --sink store --output final.npy
+    python -m acscent_media convert-frames final.npy final_frames
+
+The header (<name>.json next to <name>.npy) lists the frame number held in
+each slot and the incremental-build keys of the frames written so far.
+"""
+import numpy as np
+import json
+import os
+
+from .frame_io import PngFrames, frame_name
+
+STORE_EXT = '.npy'
+
+
+def is_store(path):
+    return path.endswith(STORE_EXT)
+
+
+def header_path(path):
+    return os.path.splitext(path)[0] + '.json'
+
+
+class FrameStore:
+    """Frames held in a memory-mapped .npy file, addressed by frame number."""
+
+    def __init__(self, path, mode='r'):
+        self.path = path
+        self.frames = np.load(path, mmap_mode=mode)
+        with open(header_path(path), encoding='utf-8') as f:
+            header = json.load(f)
+        self._numbers = header['frames']
+        self._keys = header.get('keys', {})
+        self._slots = {n: k for k, n in enumerate(self._numbers)}
+
+    @classmethod
+    def create(cls, path, numbers, frame_shape):
+        """Allocate a zero-filled store for the given frame numbers, replacing any existing one."""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        frames = np.lib.format.open_memmap(path, mode='w+', dtype=np.uint8,
+                                           shape=(len(numbers),) + tuple(frame_shape))
+        del frames
+        write_header(path, numbers, {})
+        return cls(path, 'r+')
+
+    def numbers(self):
+        return list(self._numbers)
+
+    def __len__(self):
+        return len(self._numbers)
+
+    def __contains__(self, i):
+        return i in self._slots
+
+    @property
+    def frame_shape(self):
+        return self.frames.shape[1:]
+
+    def read(self, i):
+        """Frame i as a read-only view into the mapped file."""
+        return self.frames[self._slots[i]]
+
+    def read_range(self, first, last):
+        """Frames first..last as one (N, H, W, 3) array, a view when their slots are contiguous."""
+        start = self._slots[first]
+        if self._numbers[start:start + last - first + 1] == list(range(first, last + 1)):
+            return self.frames[start:start + last - first + 1]
+        return np.stack([self.read(i) for i in range(first, last + 1)])
+
+    def frame_bytes(self, i):
+        """Bytes identifying frame i for content hashing: its raw pixels."""
+        return np.ascontiguousarray(self.read(i)).data
+
+    def write(self, i, frame):
+        self.frames[self._slots[i]] = frame
+
+    def load_keys(self):
+        return dict(self._keys)
+
+    def finish(self, numbers, keys):
+        """Flush the pixels and save the header; numbers is fixed when the store is created."""
+        self.frames.flush()
+        self._keys = dict(keys)
+        write_header(self.path, self._numbers, self._keys)
+
+
+def write_header(path, numbers, keys):
+    path = header_path(path)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump({'version': 1, 'frames': list(numbers), 'keys': keys}, f, indent=1, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+
+def open_frames(path, mode='r'):
+    """Frames at path: a FrameStore for .npy files, otherwise a PNG directory."""
+    if is_store(path):
+        return FrameStore(path, mode)
+    return PngFrames(path)
+
+
+def create_frames(path, numbers, frame_shape):
+    """Output frames at path for the given numbers.
+
+    An existing store with the same frames and shape is reused, keeping its
+    build keys; anything else is reallocated.
+    """
+    if not is_store(path):
+        os.makedirs(path, exist_ok=True)
+        return PngFrames(path)
+    try:
+        store = FrameStore(path, 'r+')
+        if store.numbers() == list(numbers) and store.frame_shape == tuple(frame_shape):
+            return store
+    except (OSError, ValueError, KeyError):
+        pass
+    return FrameStore.create(path, numbers, frame_shape)
+
+
+def frame_shape(frames, numbers):
+    """(H, W, 3) of the frames in a PngFrames or FrameStore."""
+    if isinstance(frames, FrameStore):
+        return frames.frame_shape
+    return frames.read(numbers[0]).shape
+
+
+def convert_frames(src, dst, force=False, log=print):
+    """Copy every frame between a PNG directory and a store (either direction).
+
+    Build keys describe how a frame was produced, so they travel with it; a
+    frame whose key already matches the target's is not written again.
+    Returns (total, written).
+    """
+    source = open_frames(src)
+    numbers = source.numbers()
+    if not numbers:
+        raise SystemExit(f'No frames found in {src}')
+    target = create_frames(dst, numbers, frame_shape(source, numbers))
+    keys = source.load_keys()
+    cached = {} if force else target.load_keys()
+
+    written = 0
+    for n, i in enumerate(numbers, 1):
+        key = keys.get(frame_name(i))
+        if key is None or cached.get(frame_name(i)) != key or i not in target:
+            target.write(i, source.read(i))
+            written += 1
+        if n % 50 == 0 or n == len(numbers):
+            log(f'Converted {n}/{len(numbers)}')
+    target.finish(numbers, {frame_name(i): keys[frame_name(i)] for i in numbers if frame_name(i) in keys})
+    return len(numbers), written
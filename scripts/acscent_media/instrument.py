@@ -0,0 +1,145 @@
+"""Named timing spans for the pipeline stages, recorded only while a Recorder is active.
+
+    with span('frame', frame=i):
+        with span('cursor.detect'):
+            ...
+            note(cursor_pixels=count)
+
+With no recorder, span() and note() return immediately, so the hooks stay in
+the code permanently. Every command takes --trace/--profile/--tracemalloc
+(see cli.py): the recorded spans are summarised per name, the slowest frames
+are listed with their notes (mask sizes), and the whole run is written as
+Chrome-trace JSON (chrome://tracing or https://ui.perfetto.dev).
+"""
+from contextlib import contextmanager
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+_recorder = None
+
+
+class Recorder:
+    """Collects span events as Chrome-trace 'complete' events (microsecond ts/dur)."""
+
+    def __init__(self, memory=False):
+        self.pid = os.getpid()
+        self.memory = memory
+        self.events = []
+        self._stack = []
+
+
+def active():
+    """Whether this process records spans. Forked pool workers inherit the parent's
+    recorder, but anything they add to their copy would be lost, so it does not count."""
+    return _recorder is not None and _recorder.pid == os.getpid()
+
+
+@contextmanager
+def recording(memory=False):
+    """Install a Recorder for the duration of the block; memory=True also tracks allocations."""
+    global _recorder
+    previous = _recorder
+    _recorder = Recorder(memory)
+    started = memory and not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        yield _recorder
+    finally:
+        _recorder = previous
+        if started:
+            tracemalloc.stop()
+
+
+@contextmanager
+def span(name, **args):
+    rec = _recorder
+    if rec is None:
+        yield
+        return
+
+    if rec._stack and 'frame' in rec._stack[0]['args']:
+        # Sub-steps carry their frame, so the summary can point at it
+        args.setdefault('frame', rec._stack[0]['args']['frame'])
+    event = {'name': name, 'ph': 'X', 'pid': os.getpid(), 'tid': threading.get_ident(), 'args': args}
+    rec._stack.append(event)
+    mem_start = tracemalloc.get_traced_memory() if rec.memory else None
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        end = time.perf_counter_ns()
+        rec._stack.pop()
+        event['ts'] = start / 1000
+        event['dur'] = (end - start) / 1000
+        if rec.memory:
+            # Net allocation, and how far the span raised the process-wide high-water mark
+            current, peak = tracemalloc.get_traced_memory()
+            event['args']['alloc_kb'] = round((current - mem_start[0]) / 1024, 1)
+            event['args']['peak_gain_kb'] = round((peak - mem_start[1]) / 1024, 1)
+        rec.events.append(event)
+
+
+def note(**values):
+    """Attach values (mask sizes, counts) to the innermost open span and to its outermost one."""
+    rec = _recorder
+    if rec is None or not rec._stack:
+        return
+    rec._stack[-1]['args'].update(values)
+    rec._stack[0]['args'].update(values)
+
+
+def worker_recording():
+    """recording() arguments that make a pool worker record like this process, or None when not recording."""
+    return {'memory': _recorder.memory} if active() else None
+
+
+def merge_events(events):
+    """Add events recorded in another process (pool workers) to the active recorder."""
+    if _recorder is not None:
+        _recorder.events.extend(events)
+
+
+# ============================================
+# Reports
+# ============================================
+
+def summary(events, top=5):
+    """Per-span totals plus the slowest 'frame' spans, as printable lines."""
+    stats = {}
+    for e in events:
+        s = stats.setdefault(e['name'], {'count': 0, 'total': 0.0, 'max': 0.0, 'max_at': None})
+        s['count'] += 1
+        s['total'] += e['dur']
+        if e['dur'] >= s['max']:
+            s['max'], s['max_at'] = e['dur'], e['args'].get('frame')
+
+    width = max([len(name) for name in stats] + [4])
+    lines = [f'{"span":<{width}} {"count":>6} {"total ms":>10} {"mean ms":>9} {"max ms":>9}  slowest']
+    for name, s in sorted(stats.items(), key=lambda item: -item[1]['total']):
+        at = f'frame {s["max_at"]}' if s['max_at'] is not None else ''
+        lines.append(f'{name:<{width}} {s["count"]:>6} {s["total"] / 1000:>10.1f} '
+                     f'{s["total"] / s["count"] / 1000:>9.2f} {s["max"] / 1000:>9.2f}  {at}')
+
+    frames = sorted((e for e in events if e['name'] == 'frame'), key=lambda e: -e['dur'])[:top]
+    if frames:
+        lines.append('')
+        lines.append(f'Slowest {len(frames)} frames:')
+        for e in frames:
+            args = dict(e['args'])
+            label = args.pop('frame', '?')
+            detail = ', '.join(f'{k}={v}' for k, v in sorted(args.items()))
+            lines.append(f'  frame {label}: {e["dur"] / 1000:.1f} ms  {detail}')
+    return lines
+
+
+def write_chrome_trace(events, path):
+    """Write events as Chrome-trace JSON, timestamps relative to the first event."""
+    origin = min((e['ts'] for e in events), default=0)
+    trace = [dict(e, ts=round(e['ts'] - origin, 3), dur=round(e['dur'], 3)) for e in events]
+    with open(path, 'w', encoding='utf-8') as f:
+        # Notes may hold numpy scalars
+        json.dump({'traceEvents': trace, 'displayTimeUnit': 'ms'}, f, default=lambda o: o.item())
@@ -0,0 +1,131 @@
+"""Motion-compensated interpolation between two frames, for retime segments.
+
+Block matching runs coarse to fine on a luma pyramid: one vector per block of
+the full-resolution grid, searched widely at the coarsest level and refined by
+a pixel at each finer one, with a median filter between levels to drop
+outliers. The block vectors are interpolated into a dense field and both
+frames are warped toward the intermediate time, so moving edges (the envelope
+flap) slide into place instead of cross-fading into a double image.
+"""
+import numpy as np
+from scipy.ndimage import map_coordinates, median_filter
+
+from .instrument import note, span
+
+MOTION_PARAMS = {
+    'block': 16,            # full-resolution block size; each level halves it
+    'levels': 3,
+    'search': 4,            # +-px searched at the coarsest level
+    'refine': 1,            # +-px searched at every finer level
+    'smooth': 3,            # median filter size over the block vectors, 0 = off
+    'motion_cost': 0.1,     # mean-abs-diff penalty per full-resolution px of motion, so flat areas stay still
+}
+
+LUMA = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+
+def luma_pyramid(frame, levels):
+    """Luma of a (H, W, 3) frame halved levels - 1 times by 2x2 means, finest first."""
+    y = frame[:, :, :3].astype(np.float32) @ LUMA
+    pyramid = [y]
+    for _ in range(levels - 1):
+        h, w = (y.shape[0] + 1) // 2 * 2, (y.shape[1] + 1) // 2 * 2
+        y = np.pad(y, ((0, h - y.shape[0]), (0, w - y.shape[1])), mode='edge')
+        y = y.reshape(h // 2, 2, w // 2, 2).mean(axis=(1, 3))
+        pyramid.append(y)
+    return pyramid
+
+
+def _block_coords(grid, size, shape):
+    """Row/column pixel indices of every block of the grid at one level, clipped to the image."""
+    gh, gw = grid
+    ys = np.minimum(np.arange(gh)[:, None] * size + np.arange(size), shape[0] - 1)
+    xs = np.minimum(np.arange(gw)[:, None] * size + np.arange(size), shape[1] - 1)
+    return ys[:, None, :, None], xs[None, :, None, :]
+
+
+def block_motion(a, b, params=MOTION_PARAMS):
+    """Per-block motion (gh, gw, 2) as (dy, dx) in px, such that block p of a matches b at p + v."""
+    levels = params['levels']
+    pa, pb = luma_pyramid(a, levels), luma_pyramid(b, levels)
+    h, w = a.shape[:2]
+    grid = (-(-h // params['block']), -(-w // params['block']))
+    vectors = np.zeros(grid + (2,), dtype=np.int64)
+
+    for level in range(levels - 1, -1, -1):
+        la, lb = pa[level], pb[level]
+        size = max(1, params['block'] >> level)
+        ys, xs = _block_coords(grid, size, la.shape)
+        blocks = la[ys, xs]
+        radius = params['search'] if level == levels - 1 else params['refine']
+
+        best_cost = np.full(grid, np.inf, dtype=np.float32)
+        best = vectors.copy()
+        for dy in range(-radius, radius + 1):
+            for dx in range(-radius, radius + 1):
+                vy, vx = vectors[:, :, 0] + dy, vectors[:, :, 1] + dx
+                ty = np.clip(ys + vy[:, :, None, None], 0, la.shape[0] - 1)
+                tx = np.clip(xs + vx[:, :, None, None], 0, la.shape[1] - 1)
+                cost = np.abs(blocks - lb[ty, tx]).mean(axis=(2, 3))
+                cost += params['motion_cost'] * np.hypot(vy, vx) * (1 << level)
+                better = cost < best_cost
+                best_cost[better] = cost[better]
+                best[better, 0] = vy[better]
+                best[better, 1] = vx[better]
+        vectors = best
+        if params['smooth'] > 1:
+            vectors = median_filter(vectors, size=(params['smooth'], params['smooth'], 1), mode='nearest')
+        if level:
+            vectors = vectors * 2
+    return vectors
+
+
+def dense_flow(vectors, shape, block):
+    """Bilinear interpolation of block-centre vectors to a per-pixel (2, H, W) float field."""
+    h, w = shape[:2]
+    gy = (np.arange(h, dtype=np.float32) + 0.5) / block - 0.5
+    gx = (np.arange(w, dtype=np.float32) + 0.5) / block - 0.5
+    coords = np.stack(np.meshgrid(gy, gx, indexing='ij'))
+    return np.stack([map_coordinates(vectors[:, :, c].astype(np.float32), coords, order=1, mode='nearest')
+                     for c in range(2)])
+
+
+def warp(frame, flow, scale):
+    """Sample a (H, W, 3) frame at each pixel + scale * flow, bilinearly."""
+    h, w = frame.shape[:2]
+    yy, xx = np.mgrid[0:h, 0:w].astype(np.float32)
+    coords = np.stack([yy + scale * flow[0], xx + scale * flow[1]])
+    out = np.empty(frame.shape, dtype=np.float32)
+    for c in range(frame.shape[2]):
+        out[:, :, c] = map_coordinates(frame[:, :, c].astype(np.float32), coords, order=1, mode='nearest')
+    return out
+
+
+class MotionInterpolator:
+    """Intermediate frames between source pairs, estimating each pair's motion once."""
+
+    def __init__(self, frames, params=MOTION_PARAMS):
+        self.frames = frames
+        self.params = params
+        self._flows = {}
+
+    def flow(self, i, j):
+        if (i, j) not in self._flows:
+            # Only the pair being rendered is kept: target frames visit pairs in order
+            self._flows.clear()
+            with span('motion.estimate'):
+                vectors = block_motion(self.frames[i], self.frames[j], self.params)
+                note(max_motion=int(np.abs(vectors).max()))
+                self._flows[i, j] = dense_flow(vectors, self.frames[i].shape, self.params['block'])
+        return self._flows[i, j]
+
+    def between(self, i, j, t):
+        """uint8 frame at time t in (0, 1) from source frame i to source frame j."""
+        flow = self.flow(i, j)
+        with span('motion.warp'):
+            # The field is sampled at the output pixel: a good approximation while motion is smooth
+            out = warp(self.frames[i], flow, -t)
+            out *= 1 - t
+            out += t * warp(self.frames[j], flow, 1 - t)
+            np.rint(out, out=out)
+            return out.astype(np.uint8)
@@ -0,0 +1,209 @@
+"""Image primitives shared by the frame and text pipelines.
+
+Masks are bool (H, W) arrays and images are (H, W, C) arrays. Functions that take
+`out` write into a caller-provided buffer instead of allocating a new one, and
+compositing functions modify `dst` in place.
+"""
+from PIL import Image, ImageFilter
+import numpy as np
+from scipy.ndimage import binary_dilation, distance_transform_edt
+
+from .instrument import note, span
+
+
+def channel_mask(rgb, above=None, below=None, out=None):
+    """True where every channel c is > above[c] and < below[c]. A None bound is skipped."""
+    if out is None:
+        out = np.ones(rgb.shape[:2], dtype=bool)
+    else:
+        out.fill(True)
+    for c in range(3):
+        if above is not None:
+            out &= rgb[:, :, c] > above[c]
+        if below is not None:
+            out &= rgb[:, :, c] < below[c]
+    return out
+
+
+def mask_bbox(mask, pad=0):
+    """(y0, y1, x0, x1) slice bounds of the True pixels grown by pad, clipped to the mask; None if empty."""
+    rows = np.flatnonzero(mask.any(axis=1))
+    if rows.size == 0:
+        return None
+    cols = np.flatnonzero(mask.any(axis=0))
+    h, w = mask.shape
+    return (max(rows[0] - pad, 0), min(rows[-1] + pad + 1, h),
+            max(cols[0] - pad, 0), min(cols[-1] + pad + 1, w))
+
+
+def gaussian_blur(img, radius):
+    """PIL Gaussian blur of an image or uint8 array, returned as an array."""
+    if isinstance(img, np.ndarray):
+        img = Image.fromarray(img)
+    return np.asarray(img.filter(ImageFilter.GaussianBlur(radius=radius)))
+
+
+def composite(dst, src, mask):
+    """Copy the RGB channels of src into dst wherever mask is set, in one pass over the channels."""
+    np.copyto(dst[:, :, :3], src[:, :, :3], where=mask[:, :, None], casting='unsafe')
+    return dst
+
+
+def grow_mask(mask, iterations):
+    """Dilate mask in place, touching only its bounding box plus the growth margin."""
+    with span('dilate'):
+        box = mask_bbox(mask, iterations)
+        if box is not None and iterations > 0:
+            y0, y1, x0, x1 = box
+            tile = mask[y0:y1, x0:x1]
+            # Everything outside the box is False, so a zero border matches a full-frame dilation
+            tile[...] = binary_dilation(tile, iterations=iterations)
+    return mask
+
+
+def blur_fill(src, mask, radius, domain=None):
+    """Fill values from a Gaussian blur of the whole src tile."""
+    return gaussian_blur(src, radius)
+
+
+def _relax(tile, mask, weight, iterations):
+    """Jacobi relaxation of the masked pixels of a float (h, w, 3) tile.
+
+    Each masked pixel moves to the weighted mean of its 4 neighbours; neighbours
+    with weight 0 (outside the fill domain) do not contribute.
+    """
+    buf = np.pad(tile, ((1, 1), (1, 1), (0, 0)), mode='edge')
+    wbuf = np.pad(weight, 1)[:, :, None]
+    shifts = [(slice(None, -2), slice(1, -1)), (slice(2, None), slice(1, -1)),
+              (slice(1, -1), slice(None, -2)), (slice(1, -1), slice(2, None))]
+    weights = [wbuf[sy, sx] for sy, sx in shifts]
+    total = np.sum(weights, axis=0)
+    where = mask[:, :, None] & (total > 0)
+    np.maximum(total, 1e-6, out=total)
+
+    inner = buf[1:-1, 1:-1]
+    acc = np.empty_like(inner)
+    tmp = np.empty_like(inner)
+    for _ in range(iterations):
+        acc.fill(0)
+        for (sy, sx), w in zip(shifts, weights):
+            np.multiply(buf[sy, sx], w, out=tmp)
+            acc += tmp
+        acc /= total
+        np.copyto(inner, acc, where=where)
+        # Keep the replicated border in step with the edge pixels
+        buf[0], buf[-1] = buf[1], buf[-2]
+        buf[:, 0], buf[:, -1] = buf[:, 1], buf[:, -2]
+    return inner
+
+
+def _diffuse(tile, mask, weight, iterations=None, smooth=12):
+    known = ~mask & (weight > 0)
+    h, w = mask.shape
+    if min(h, w) >= 16:
+        # Solve the half-resolution problem first (2x2 blocks, averaging their known pixels)
+        # and upsample it as the starting guess, so only a few fine iterations are needed.
+        h2, w2 = h // 2, w // 2
+        k = known[:h2 * 2, :w2 * 2]
+        count = k.reshape(h2, 2, w2, 2).sum(axis=(1, 3))
+        total = (tile[:h2 * 2, :w2 * 2] * k[:, :, None]).reshape(h2, 2, w2, 2, 3).sum(axis=(1, 3))
+        coarse = (total / np.maximum(count, 1)[:, :, None]).astype(np.float32)
+        coarse_weight = weight[:h2 * 2, :w2 * 2].reshape(h2, 2, w2, 2).max(axis=(1, 3))
+        coarse = _diffuse(coarse, count == 0, coarse_weight, smooth=smooth)
+
+        guess = np.repeat(np.repeat(coarse, 2, axis=0), 2, axis=1)
+        guess = np.pad(guess, ((0, h - h2 * 2), (0, w - w2 * 2), (0, 0)), mode='edge')
+        tile[mask] = guess[mask]
+        return _relax(tile, mask, weight, smooth if iterations is None else iterations)
+
+    if known.any():
+        tile[mask] = tile[known].mean(axis=0)
+    if iterations is None:
+        iterations = int(4 * distance_transform_edt(mask).max()) + 8
+    return _relax(tile, mask, weight, iterations)
+
+
+def diffusion_fill(src, mask, radius=None, domain=None, iterations=None):
+    """Fill values that relax the masked pixels toward the average of their 4 neighbours.
+
+    Known pixels stay fixed, so colour only flows in from the mask boundary; with
+    a domain mask, only known pixels inside it feed the fill. It runs coarse-to-fine:
+    each pyramid level starts from the upsampled solution of the level below, so
+    large holes converge in a handful of iterations per level.
+    """
+    tile = src[:, :, :3].astype(np.float32)
+    weight = np.ones(mask.shape, np.float32) if domain is None else (domain | mask).astype(np.float32)
+    if not (~mask & (weight > 0)).any():
+        return tile
+    return _diffuse(tile, mask, weight, iterations)
+
+
+# Inpaint backends: fill(src_tile, mask_tile, radius, domain_tile) -> (h, w, >=3) fill values
+INPAINT_BACKENDS = {
+    'blur': blur_fill,
+    'diffusion': diffusion_fill,
+}
+
+
+def inpaint_halo(radius, backend='blur'):
+    """Pixels around the mask a backend reads; 3 sigma makes a tile blur match a full-frame one."""
+    return int(np.ceil(3 * radius)) if backend == 'blur' else 1
+
+
+def inpaint(dst, src, mask, radius, backend='blur', domain=None):
+    """Fill the masked pixels of dst from src, working only on the mask's bounding box.
+
+    The box is padded by the halo the backend reads, so the result matches running
+    the backend on the full frame while the cost scales with the mask, not the frame.
+    domain optionally limits which unmasked pixels a backend may draw colour from.
+    """
+    box = mask_bbox(mask, inpaint_halo(radius, backend))
+    if box is None:
+        return dst
+    y0, y1, x0, x1 = box
+    tile_mask = mask[y0:y1, x0:x1]
+    tile_domain = None if domain is None else domain[y0:y1, x0:x1]
+    note(inpaint_pixels=int(np.count_nonzero(tile_mask)), inpaint_tile=(y1 - y0) * (x1 - x0))
+    with span(backend):
+        fill = INPAINT_BACKENDS[backend](np.asarray(src)[y0:y1, x0:x1], tile_mask, radius, tile_domain)
+    with span('composite'):
+        composite(dst[y0:y1, x0:x1], fill, tile_mask)
+    return dst
+
+
+def bg_distance(rgb, bg_mean, out=None):
+    """Per-pixel Euclidean RGB distance from bg_mean, using one (H, W, 3) scratch buffer."""
+    diff = np.subtract(rgb, bg_mean, dtype=np.float32)
+    diff *= diff
+    out = np.sum(diff, axis=2, out=out)
+    return np.sqrt(out, out=out)
+
+
+def add_outline(region, text_mask, radius, soft_radius, color=(255, 255, 255)):
+    """Paint a hard outline out to `radius` px around text_mask, fading to nothing at `soft_radius`.
+
+    Both zones come from one Euclidean distance transform (distance <= r is exactly
+    a disk dilation of radius r), computed only on the text bounding box padded by
+    soft_radius, so cost does not grow with the radius squared. Works in place on
+    the float (H, W, C) region.
+    """
+    box = mask_bbox(text_mask, int(np.ceil(soft_radius)) + 1)
+    if box is None:
+        return region
+    y0, y1, x0, x1 = box
+    mask = text_mask[y0:y1, x0:x1]
+
+    dist = distance_transform_edt(~mask)
+
+    # alpha: 1 in the hard outline, linear falloff in the soft ring, 0 on text and beyond
+    if soft_radius > radius:
+        alpha = np.clip(1.0 - (dist - radius) / (soft_radius - radius), 0, 1)
+    else:
+        alpha = (dist <= radius).astype(np.float64)
+    alpha[mask] = 0
+    alpha = alpha[:, :, None]
+
+    tile = region[y0:y1, x0:x1, :3]
+    tile *= 1 - alpha
+    tile += alpha * np.asarray(color, dtype=region.dtype)
+    return region
@@ -0,0 +1,166 @@
+"""Responsive image variants for public/images: several widths in WebP and AVIF, plus a manifest.
+
+Every PNG/JPEG under public/images is a source. Its variants go to
+public/images/variants/<same path>-<width>.<format>, extension included so that
+foo.png and foo.jpg never share a variant, and variants/manifest.json
+records, per source URL, its size and every variant's URL, dimensions and
+bytes, for the Next.js side to read:
+    {"images": {"/images/bg.png": {"width": 3072, "height": 1728, "bytes": ...,
+                "variants": [{"src": "/images/variants/bg.png-960.webp", "width": 960, ...}]}}}
+
+A source is re-encoded only when its content hash or the encoding settings
+change, so the command is cheap enough to run before every build.
+"""
+from PIL import Image, features
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import json
+import os
+
+SOURCE_EXTS = ('.png', '.jpg', '.jpeg')
+VARIANTS_DIR = 'variants'
+MANIFEST = 'manifest.json'
+MANIFEST_VERSION = 2        # 2: variant names keep the source extension
+
+MEDIA_PARAMS = {
+    'widths': [480, 960, 1920],     # capped at the source width, never upscaled
+    'formats': ['webp', 'avif'],
+    'webp_quality': 80,
+    'avif_quality': 60,
+}
+
+
+def find_sources(images_dir):
+    """Source image paths relative to images_dir, sorted, skipping the variants directory."""
+    sources = []
+    for root, dirs, files in os.walk(images_dir):
+        dirs[:] = sorted(d for d in dirs if os.path.join(root, d) != os.path.join(images_dir, VARIANTS_DIR))
+        for name in sorted(files):
+            if name.lower().endswith(SOURCE_EXTS):
+                sources.append(os.path.relpath(os.path.join(root, name), images_dir).replace(os.sep, '/'))
+    return sources
+
+
+def variant_widths(width, widths):
+    return sorted({min(w, width) for w in widths})
+
+
+def variant_path(rel, width, fmt):
+    return f'{VARIANTS_DIR}/{rel}-{width}.{fmt}'
+
+
+def source_key(data, media):
+    digest = hashlib.sha256(data)
+    digest.update(json.dumps(media, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def encode_variants(images_dir, rel, media):
+    """Write every variant of one source. Returns its manifest entry."""
+    path = os.path.join(images_dir, rel)
+    with Image.open(path) as img:
+        img.load()
+        width, height = img.size
+        # Keep transparency where the source has any; everything else is plain RGB
+        has_alpha = img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info)
+        img = img.convert('RGBA' if has_alpha else 'RGB')
+
+    variants = []
+    for w in variant_widths(width, media['widths']):
+        h = max(1, round(height * w / width))
+        resized = img if w == width else img.resize((w, h), Image.LANCZOS)
+        for fmt in media['formats']:
+            out_rel = variant_path(rel, w, fmt)
+            out = os.path.join(images_dir, out_rel)
+            os.makedirs(os.path.dirname(out), exist_ok=True)
+            if fmt == 'webp':
+                resized.save(out + '.tmp', format='WEBP', quality=media['webp_quality'], method=6)
+            else:
+                resized.save(out + '.tmp', format='AVIF', quality=media['avif_quality'])
+            os.replace(out + '.tmp', out)
+            variants.append({'src': '/images/' + out_rel, 'width': w, 'height': h, 'format': fmt,
+                             'bytes': os.path.getsize(out)})
+    return {'width': width, 'height': height, 'bytes': os.path.getsize(path), 'variants': variants}
+
+
+def largest_variant(entry):
+    """The smallest file among the widest variants: what a full-size request would load."""
+    widest = max(v['width'] for v in entry['variants'])
+    return min((v for v in entry['variants'] if v['width'] == widest), key=lambda v: v['bytes'])
+
+
+def _optimize_job(job):
+    images_dir, rel, cached, media = job
+    with open(os.path.join(images_dir, rel), 'rb') as f:
+        key = source_key(f.read(), media)
+    if cached is not None and cached.get('key') == key and all(
+            os.path.exists(os.path.join(images_dir, v['src'][len('/images/'):])) for v in cached['variants']):
+        return rel, cached, False
+    entry = encode_variants(images_dir, rel, media)
+    entry['key'] = key
+    return rel, entry, True
+
+
+def load_media_manifest(images_dir):
+    """Cached entries of the last run, or {} when there is none or its layout is older."""
+    try:
+        with open(os.path.join(images_dir, VARIANTS_DIR, MANIFEST), encoding='utf-8') as f:
+            doc = json.load(f)
+        return doc['images'] if doc.get('version') == MANIFEST_VERSION else {}
+    except (OSError, ValueError, KeyError):
+        return {}
+
+
+def optimize_media(images_dir, workers=1, force=False, media=MEDIA_PARAMS, log=print):
+    """Bring public/images/variants up to date with the sources. Returns the manifest's images dict."""
+    if not media['widths'] or min(media['widths']) < 1:
+        raise SystemExit(f'Variant widths must be positive, got {media["widths"]}')
+    if 'avif' in media['formats'] and not features.check('avif'):
+        if media['formats'] == ['avif']:
+            raise SystemExit('This Pillow build has no AVIF encoder (Pillow >= 11.3 needed): '
+                             'add webp to the formats or upgrade Pillow')
+        log('Note: this Pillow build has no AVIF encoder (Pillow >= 11.3 needed), writing WebP only')
+        media = dict(media, formats=[f for f in media['formats'] if f != 'avif'])
+    if not media['formats']:
+        raise SystemExit('No variant formats given (choose from webp, avif)')
+    cached = {} if force else load_media_manifest(images_dir)
+    sources = find_sources(images_dir)
+    jobs = [(images_dir, rel, cached.get('/images/' + rel), media) for rel in sources]
+
+    # Sources are independent and AVIF encoding is slow, so spread them over a process pool
+    if workers <= 1:
+        results = map(_optimize_job, jobs)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        results = executor.map(_optimize_job, jobs)
+
+    images = {}
+    try:
+        for rel, entry, rebuilt in results:
+            images['/images/' + rel] = entry
+            best = largest_variant(entry)
+            status = 'encoded' if rebuilt else 'unchanged'
+            log(f'  {rel}: {entry["width"]}x{entry["height"]} {entry["bytes"] / 1024:.0f} KiB -> '
+                f'{best["bytes"] / 1024:.0f} KiB {best["format"]} at {best["width"]}w, '
+                f'{len(entry["variants"])} variants ({status})')
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    # Drop variants of sources that were removed or whose widths changed
+    keep = {v['src'][len('/images/'):] for entry in images.values() for v in entry['variants']}
+    variants_root = os.path.join(images_dir, VARIANTS_DIR)
+    for root, dirs, files in os.walk(variants_root):
+        for name in files:
+            rel = os.path.relpath(os.path.join(root, name), images_dir).replace(os.sep, '/')
+            if name != MANIFEST and rel not in keep:
+                os.remove(os.path.join(root, name))
+
+    os.makedirs(variants_root, exist_ok=True)
+    path = os.path.join(variants_root, MANIFEST)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump({'version': MANIFEST_VERSION, 'params': media, 'images': images}, f, indent=1, sort_keys=True)
+        f.write('\n')
+    os.replace(path + '.tmp', path)
+    return images
@@ -0,0 +1,87 @@
+"""Batch frame cleanup: process pool, incremental manifest and the optional temporal run."""
+from concurrent.futures import ProcessPoolExecutor
+
+from .frame_io import frame_name
+from .frames import CURSOR_PARAMS, PAPER_PARAMS, _clean_frame_job, clean_frame, frame_key
+from .framestore import create_frames, frame_shape, open_frames
+from .instrument import merge_events, worker_recording
+from .temporal import PaperTracker
+
+
+def _clean_tracked(frames, source, target, cached, cursor, paper, temporal):
+    """Clean the paper-stage frames in order through one PaperTracker.
+
+    Each output depends on the frames before it, so the run is all-or-nothing:
+    it is skipped only when every chained key matches the manifest.
+    """
+    keys = []
+    prev_key = None
+    for i in frames:
+        prev_key = frame_key(i, source, cursor, paper, temporal, prev_key)
+        keys.append(prev_key)
+
+    up_to_date = all(
+        cached.get(frame_name(i)) == key and i in target
+        for i, key in zip(frames, keys)
+    )
+    tracker = None if up_to_date else PaperTracker(paper, temporal)
+    for i, key in zip(frames, keys):
+        if tracker is not None:
+            clean_frame(i, source, target, cursor, paper, tracker)
+        yield frame_name(i), key, tracker is not None, None
+
+
+def clean_frames(proc_dir, out_dir, workers=1, force=False, cursor=CURSOR_PARAMS, paper=PAPER_PARAMS,
+                 temporal=None, log=print):
+    """Clean every frame in proc_dir into out_dir. Returns (total, rebuilt).
+
+    Either path may be a PNG directory or a .npy frame store (see framestore);
+    pool workers write straight into the output store's mapping. With temporal
+    params (see temporal.TEMPORAL_PARAMS), frames from the paper stage on are
+    cleaned sequentially by a PaperTracker while the rest use the pool.
+    """
+    source = open_frames(proc_dir)
+    numbers = source.numbers()
+    total = len(numbers)
+    if not numbers:
+        raise SystemExit(f'No frames found in {proc_dir}')
+    target = create_frames(out_dir, numbers, frame_shape(source, numbers))
+
+    # Frames whose source and parameters are unchanged since the last run are skipped
+    cached = {} if force else target.load_keys()
+    frames, tracked = numbers, []
+    if temporal is not None:
+        tracked = [i for i in numbers if i >= paper['first_frame']]
+        frames = [i for i in numbers if i < paper['first_frame']]
+    trace = worker_recording()
+    jobs = [(i, proc_dir, out_dir, cached.get(frame_name(i)), cursor, paper, trace) for i in frames]
+
+    # Every frame is independent, so spread them over a process pool.
+    # executor.map yields in submission order, which keeps progress output ordered.
+    if workers <= 1:
+        results = map(_clean_frame_job, jobs)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        chunksize = max(1, len(jobs) // (workers * 4))
+        results = executor.map(_clean_frame_job, jobs, chunksize=chunksize)
+
+    manifest = {}
+    rebuilt = 0
+    try:
+        for runner in (results, _clean_tracked(tracked, source, target, cached, cursor, paper, temporal)):
+            for fname, key, was_built, events in runner:
+                if events:
+                    merge_events(events)
+                manifest[fname] = key
+                rebuilt += was_built
+                n = len(manifest)
+                if n % 20 == 0 or n == total:
+                    log(f'Processed {n}/{total}')
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    # Saves the keys and drops outputs whose source frame no longer exists
+    target.finish(numbers, manifest)
+    return total, rebuilt
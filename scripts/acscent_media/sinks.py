@@ -0,0 +1,302 @@
+"""Frame sinks for rendered timelines.
+
+Every sink takes write(frame, count, key): `count` repeats of one uint8 (H, W, 3)
+frame, where `key` identifies a source frame (None for blends) so repeats can be
+stored once.
+"""
+from PIL import Image
+import numpy as np
+import hashlib
+import os
+import shutil
+import subprocess
+import sys
+
+from .frame_io import FRAME_PATTERN, frame_name, load_manifest, save_manifest
+from .framestore import create_frames
+
+SINKS = ('png', 'concat', 'raw', 'ffmpeg', 'webp', 'store')
+
+# ffmpeg encoder settings per --codec; crf and preset are the defaults the CLI can override
+CODECS = {
+    'h264': {'args': ['-c:v', 'libx264', '-pix_fmt', 'yuv420p'], 'crf': 23, 'preset': 'slow'},
+    'hevc': {'args': ['-c:v', 'libx265', '-pix_fmt', 'yuv420p', '-tag:v', 'hvc1'], 'crf': 28, 'preset': 'slow'},
+    'vp9': {'args': ['-c:v', 'libvpx-vp9', '-pix_fmt', 'yuv420p', '-b:v', '0', '-row-mt', '1'], 'crf': 33,
+            'preset': None},
+    'av1': {'args': ['-c:v', 'libsvtav1', '-pix_fmt', 'yuv420p'], 'crf': 35, 'preset': '6'},
+}
+
+
+class PngSink:
+    """Writes numbered PNGs incrementally.
+
+    Every output frame is keyed by a hash of its pixels in a manifest, so a re-run
+    only re-encodes frames whose content changed. A source frame already written
+    in this run is hard-linked instead of re-encoded.
+    """
+
+    def __init__(self, out_dir, force=False):
+        os.makedirs(out_dir, exist_ok=True)
+        self.out_dir = out_dir
+        self.count = 0
+        self.encoded = 0
+        self._cached = {} if force else load_manifest(out_dir)
+        self._manifest = {}
+        self._written = {}  # source frame number -> (path, pixel hash)
+
+    def write(self, frame, count=1, key=None):
+        if key in self._written:
+            src, digest = self._written[key]
+        else:
+            src = None
+            digest = hashlib.blake2b(np.ascontiguousarray(frame).data, digest_size=16).hexdigest()
+
+        for _ in range(count):
+            self.count += 1
+            name = frame_name(self.count)
+            path = os.path.join(self.out_dir, name)
+            self._manifest[name] = digest
+            if self._cached.get(name) == digest and os.path.exists(path):
+                pass
+            elif src is not None:
+                if os.path.lexists(path):
+                    os.remove(path)
+                try:
+                    os.link(src, path)
+                except OSError:
+                    shutil.copyfile(src, path)
+            else:
+                # Replace rather than overwrite, so files hard-linked to the old one keep their content
+                Image.fromarray(frame).save(path + '.tmp', format='PNG')
+                os.replace(path + '.tmp', path)
+                self.encoded += 1
+            if src is None:
+                src = path
+
+        if key is not None:
+            self._written[key] = (src, digest)
+
+    def close(self):
+        # Drop frames left over from a longer previous timeline
+        for name in os.listdir(self.out_dir):
+            if FRAME_PATTERN.fullmatch(name) and name not in self._manifest:
+                os.remove(os.path.join(self.out_dir, name))
+        save_manifest(self.out_dir, self._manifest)
+
+
+class ConcatSink:
+    """Writes each unique frame once plus an ffconcat list carrying hold durations.
+
+    Encode with: ffmpeg -f concat -i timeline.ffconcat -vsync cfr -r <fps> out.mp4
+    """
+
+    def __init__(self, out_dir, fps):
+        if os.path.exists(out_dir):
+            shutil.rmtree(out_dir)
+        os.makedirs(out_dir)
+        self.out_dir = out_dir
+        self.fps = fps
+        self.count = 0
+        self.encoded = 0
+        self._names = {}
+        self._entries = []
+
+    def write(self, frame, count=1, key=None):
+        name = self._names.get(key) if key is not None else None
+        if name is None:
+            self.encoded += 1
+            name = f'unique_{self.encoded:04d}.png'
+            Image.fromarray(frame).save(os.path.join(self.out_dir, name))
+            if key is not None:
+                self._names[key] = name
+        self._entries.append((name, count))
+        self.count += count
+
+    def close(self):
+        lines = ['ffconcat version 1.0']
+        for name, count in self._entries:
+            lines.append(f"file '{name}'")
+            lines.append(f'duration {count / self.fps:.6f}')
+        if self._entries:
+            # The concat demuxer ignores the duration of the final entry unless it is repeated
+            lines.append(f"file '{self._entries[-1][0]}'")
+        with open(os.path.join(self.out_dir, 'timeline.ffconcat'), 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+
+
+class RawSink:
+    """Writes packed rgb24 frames back to back to a file, or to stdout for '-'."""
+
+    def __init__(self, path):
+        self._own = path != '-'
+        self.stream = open(path, 'wb') if self._own else sys.stdout.buffer
+        self.count = 0
+
+    def write(self, frame, count=1, key=None):
+        data = np.ascontiguousarray(frame).data
+        for _ in range(count):
+            self.stream.write(data)
+        self.count += count
+
+    def close(self):
+        if self._own:
+            self.stream.close()
+        else:
+            self.stream.flush()
+
+
+def default_codec(path):
+    return 'vp9' if path.endswith('.webm') else 'h264'
+
+
+class FfmpegSink:
+    """Pipes rgb24 frames into an ffmpeg subprocess started on the first frame.
+
+    The codec defaults from the file extension (.webm: vp9, otherwise h264);
+    crf and preset default from CODECS.
+    """
+
+    def __init__(self, path, fps, codec=None, crf=None, preset=None):
+        self.path = path
+        self.fps = fps
+        self.codec = codec or default_codec(path)
+        self.crf = crf if crf is not None else CODECS[self.codec]['crf']
+        self.preset = preset or CODECS[self.codec]['preset']
+        self.proc = None
+        self.count = 0
+
+    def command(self, w, h):
+        cmd = [
+            'ffmpeg', '-y', '-loglevel', 'error',
+            '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-s', f'{w}x{h}', '-r', str(self.fps),
+            '-i', '-', '-an',
+            # 4:2:0 chroma needs even dimensions
+            '-vf', 'crop=trunc(iw/2)*2:trunc(ih/2)*2',
+        ] + CODECS[self.codec]['args'] + ['-crf', str(self.crf)]
+        if self.preset:
+            cmd += ['-preset', self.preset]
+        if self.path.endswith(('.mp4', '.mov', '.m4v')):
+            # Index up front so browsers can start playing before the download finishes
+            cmd += ['-movflags', '+faststart']
+        return cmd + [self.path]
+
+    def write(self, frame, count=1, key=None):
+        if self.proc is None:
+            h, w = frame.shape[:2]
+            try:
+                self.proc = subprocess.Popen(self.command(w, h), stdin=subprocess.PIPE)
+            except FileNotFoundError:
+                raise SystemExit('ffmpeg was not found on PATH (use --sink webp to encode without it)')
+        data = np.ascontiguousarray(frame).data
+        try:
+            for _ in range(count):
+                self.proc.stdin.write(data)
+        except BrokenPipeError:
+            # ffmpeg quit early (unknown codec or preset, missing encoder): report its exit code
+            self._finish()
+            raise SystemExit(f'ffmpeg stopped reading frames for {self.path}')
+        self.count += count
+
+    def close(self):
+        if self.proc is not None:
+            self._finish()
+
+    def _finish(self):
+        proc, self.proc = self.proc, None
+        try:
+            proc.stdin.close()
+        except BrokenPipeError:
+            pass
+        if proc.wait() != 0:
+            raise SystemExit(f'ffmpeg exited with code {proc.returncode} while writing {self.path} '
+                             f'(its error output is above; check --codec, --crf and --preset)')
+
+
+class WebpSink:
+    """Encodes an animated WebP with Pillow, so no ffmpeg is needed.
+
+    Held source frames become one WebP frame with a longer duration. Durations
+    are rounded on the cumulative timeline, so the total never drifts from
+    count / fps even though each one is whole milliseconds.
+    """
+
+    def __init__(self, path, fps, quality=80, lossless=False):
+        self.path = path
+        self.fps = fps
+        self.quality = quality
+        self.lossless = lossless
+        self.count = 0
+        self._images = []
+        self._durations = []
+
+    def write(self, frame, count=1, key=None):
+        start = round(self.count * 1000 / self.fps)
+        self.count += count
+        self._images.append(Image.fromarray(frame))
+        self._durations.append(round(self.count * 1000 / self.fps) - start)
+
+    def close(self):
+        if not self._images:
+            return
+        self._images[0].save(
+            self.path, format='WEBP', save_all=True, append_images=self._images[1:],
+            duration=self._durations, loop=0, quality=self.quality, lossless=self.lossless, method=6,
+        )
+
+
+class StoreSink:
+    """Writes frames 1..total into a memory-mapped frame store (see framestore).
+
+    Like PngSink, every frame's pixel hash is kept as its key, so unchanged
+    frames are not copied again and later PNG exports can skip them too.
+    """
+
+    def __init__(self, path, total, force=False):
+        self.path = path
+        self.total = total
+        self.force = force
+        self.store = None
+        self.count = 0
+        self.encoded = 0
+        self._keys = {}
+        self._digests = {}  # source frame number -> pixel hash
+
+    def write(self, frame, count=1, key=None):
+        if self.store is None:
+            self.store = create_frames(self.path, range(1, self.total + 1), frame.shape)
+            self._cached = {} if self.force else self.store.load_keys()
+        digest = self._digests.get(key) if key is not None else None
+        if digest is None:
+            digest = hashlib.blake2b(np.ascontiguousarray(frame).data, digest_size=16).hexdigest()
+            if key is not None:
+                self._digests[key] = digest
+
+        for _ in range(count):
+            self.count += 1
+            name = frame_name(self.count)
+            self._keys[name] = digest
+            if self._cached.get(name) != digest:
+                self.store.write(self.count, frame)
+                self.encoded += 1
+
+    def close(self):
+        if self.store is not None:
+            self.store.finish(self.store.numbers(), self._keys)
+
+
+def make_sink(kind, output, fps, force=False, total=None, codec=None, crf=None, preset=None, quality=80,
+              lossless=False):
+    if kind == 'png':
+        return PngSink(output, force)
+    if kind == 'concat':
+        return ConcatSink(output, fps)
+    if kind == 'raw':
+        return RawSink(output)
+    if kind == 'ffmpeg':
+        return FfmpegSink(output, fps, codec, crf, preset)
+    if kind == 'webp':
+        return WebpSink(output, fps, quality, lossless)
+    if kind == 'store':
+        # A store is allocated up front, so it needs the timeline length
+        return StoreSink(output, total, force)
+    raise ValueError(f'Unknown sink: {kind!r}')
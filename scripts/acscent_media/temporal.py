@@ -0,0 +1,111 @@
+"""Temporally coherent letter-paper cleanup for consecutive, mostly static frames.
+
+Instead of detecting the paper and its text from scratch on every frame, the
+tracker keeps the previous frame's masks, paper colour and clean plate. Only
+pixels that changed by more than diff_threshold since they were last detected
+are re-detected and re-inpainted; static pixels keep last frame's fill, which
+also stops the blur fill from flickering between frames. Comparing against the
+value at the last detection (not just the previous frame) catches slow fades
+that never move more than the threshold in one step.
+"""
+import numpy as np
+
+from .frames import PAPER_PARAMS, detect_paper_text, paper_box, paper_text_mask
+from .instrument import note, span
+from .ops import composite, grow_mask, inpaint, inpaint_halo, mask_bbox
+
+TEMPORAL_PARAMS = {
+    'diff_threshold': 12,       # largest per-channel change still treated as static
+    'grow': 4,                  # px added around changed pixels before re-detecting
+    'reset_fraction': 0.5,      # re-detect from scratch when this much of the paper region changed
+}
+
+
+class PaperTracker:
+    """Paper text removal that carries masks and the clean plate from one frame to the next.
+
+    Frames must be fed in order through clean(); reset() forgets the history.
+    """
+
+    def __init__(self, paper=PAPER_PARAMS, temporal=TEMPORAL_PARAMS):
+        self.paper = paper
+        self.temporal = temporal
+        self.full_detections = 0
+        self.reset()
+
+    def reset(self):
+        self.ref_src = None
+        self.prev_out = None
+        self.prev_mask = None
+        self.is_paper = None
+        self.text_mask = None
+        self.paper_avg = None
+
+    def clean(self, arr, src):
+        """Remove the paper text from float frame arr in place; src is its untouched uint8 source."""
+        if self.ref_src is None or self.ref_src.shape != src[:, :, :3].shape or self.paper_avg is None:
+            return self._detect(arr, src)
+
+        top, bottom, left, right = paper_box(arr.shape, self.paper)
+        with span('paper.diff'):
+            rgb_src = src[:, :, :3].astype(np.int16)
+            moved = np.abs(rgb_src - self.ref_src).max(axis=2) > self.temporal['diff_threshold']
+            changed = grow_mask(moved.copy(), self.temporal['grow'])
+            changed_region = changed[top:bottom, left:right]
+            changed_count = np.count_nonzero(changed_region)
+        note(changed_pixels=changed_count)
+        if changed_count > self.temporal['reset_fraction'] * changed_region.size:
+            return self._detect(arr, src)
+
+        # Re-detect only the changed pixels, against the paper colour measured earlier
+        box = mask_bbox(changed_region)
+        if box is not None:
+            y0, y1, x0, x1 = box
+            region = arr[top:bottom, left:right, :3]
+            with span('paper.detect'):
+                is_paper, text_mask, _ = detect_paper_text(region[y0:y1, x0:x1], self.paper, self.paper_avg)
+            where = changed_region[y0:y1, x0:x1]
+            self.is_paper[y0:y1, x0:x1][where] = is_paper[where]
+            self.text_mask[y0:y1, x0:x1][where] = text_mask[where]
+
+        mask = None
+        text_count = np.count_nonzero(self.text_mask)
+        note(text_pixels=text_count)
+        if text_count > self.paper['min_text_pixels']:
+            mask, paper_full = paper_text_mask(arr.shape, self.is_paper, self.text_mask, self.paper)
+            # Static pixels that were filled last frame keep that fill (the clean plate),
+            # unless something moved within the pixels the fill was taken from (the inpaint halo)
+            reuse = mask & ~grow_mask(moved, inpaint_halo(self.paper['blur_radius'], self.paper['inpaint']))
+            if self.prev_mask is not None:
+                reuse &= self.prev_mask
+            else:
+                reuse[...] = False
+            composite(arr, self.prev_out, reuse)
+            inpaint(arr, src, mask & ~reuse, self.paper['blur_radius'], self.paper['inpaint'], domain=paper_full)
+
+        # Reference values advance only where the frame was re-detected
+        np.copyto(self.ref_src, rgb_src, where=changed[:, :, None])
+        self._remember(arr, mask)
+        return arr
+
+    def _detect(self, arr, src):
+        self.full_detections += 1
+        top, bottom, left, right = paper_box(arr.shape, self.paper)
+        with span('paper.detect', full=True):
+            self.is_paper, text_mask, self.paper_avg = detect_paper_text(arr[top:bottom, left:right, :3], self.paper)
+        self.text_mask = text_mask if text_mask is not None else np.zeros_like(self.is_paper)
+
+        mask = None
+        text_count = np.count_nonzero(self.text_mask)
+        note(text_pixels=text_count)
+        if text_count > self.paper['min_text_pixels']:
+            mask, paper_full = paper_text_mask(arr.shape, self.is_paper, self.text_mask, self.paper)
+            inpaint(arr, src, mask, self.paper['blur_radius'], self.paper['inpaint'], domain=paper_full)
+
+        self.ref_src = src[:, :, :3].astype(np.int16)
+        self._remember(arr, mask)
+        return arr
+
+    def _remember(self, arr, mask):
+        self.prev_out = arr.copy()
+        self.prev_mask = mask
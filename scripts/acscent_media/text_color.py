@@ -0,0 +1,131 @@
+"""Background art title: rainbow text recolored to green with a white outline."""
+import numpy as np
+
+from .instrument import note, span
+from .ops import add_outline, bg_distance
+
+# Target green shades
+DARK_GREEN = (20, 48, 28)
+LIGHT_GREEN = (55, 118, 62)
+
+# Title detection thresholds (val_* are fractions of 255) and outline widths in px
+TITLE_PARAMS = {
+    'sat_min': 0.12,                # rainbow fill: saturated,
+    'val_min': 0.25,                # not too dark,
+    'bg_dist_min': 25,              # and away from the background colour
+    'outline_val_max': 0.45,        # dark outline strokes
+    'outline_bg_dist': 35,
+    'dominance': 15,                # R or B this far above G
+    'dominance_bg_dist': 20,
+    'radius': 18,
+    'soft_radius': 25,
+}
+
+
+def title_text_mask(rgb, val, sat, bg_dist, title=TITLE_PARAMS):
+    """Title text mask of a float RGB band from its HSV-like val/sat and background distance."""
+    # Detect rainbow fill pixels (colored, not background)
+    is_rainbow = (sat > title['sat_min']) & (val > title['val_min'] * 255) & (bg_dist > title['bg_dist_min'])
+    # Detect dark outlines
+    is_outline = (val < title['outline_val_max'] * 255) & (bg_dist > title['outline_bg_dist'])
+    # Combined text mask
+    is_text = is_rainbow | is_outline
+
+    # Also catch any remaining colored pixels by checking R or B dominance
+    r_dom = rgb[:, :, 0] > rgb[:, :, 1] + title['dominance']
+    r_dom |= rgb[:, :, 2] > rgb[:, :, 1] + title['dominance']
+    r_dom &= bg_dist > title['dominance_bg_dist']
+    is_text |= r_dom
+    return is_text
+
+
+def recolor_text(region, bg_mean, dark_green=DARK_GREEN, light_green=LIGHT_GREEN, title=TITLE_PARAMS):
+    """Turn the rainbow text in a float32 (H, W, C) band green, in place. Returns the text mask.
+
+    Text pixels get the green shade for their luminance and anti-aliased edges are
+    blended toward it, both through one alpha blend over all three channels.
+    """
+    rgb = region[:, :, :3]
+
+    # HSV-like analysis (val stays on the 0-255 scale, sat is scale-free)
+    val = rgb.max(axis=2)
+    delta = rgb.min(axis=2)
+    np.subtract(val, delta, out=delta)
+    sat = np.divide(delta, val, out=np.zeros_like(val), where=val > 0)
+
+    bg_dist = bg_distance(rgb, bg_mean)
+    is_text = title_text_mask(rgb, val, sat, bg_dist, title)
+
+    # Luminance for green mapping, reusing the sat buffer
+    lum = np.multiply(rgb[:, :, 0], 0.299 / 255, out=sat)
+    lum += rgb[:, :, 1] * (0.587 / 255)
+    lum += rgb[:, :, 2] * (0.114 / 255)
+    np.clip(lum, 0, 1, out=lum)
+
+    # alpha: 1 on text, anti-aliasing ramp on the edge band, 0 elsewhere (reuses val)
+    alpha = np.subtract(bg_dist, 12, out=val)
+    alpha /= 13.0
+    np.clip(alpha, 0, 1, out=alpha)
+    alpha[(bg_dist <= 12) | (bg_dist > 25)] = 0
+    alpha[is_text] = 1
+
+    dark = np.asarray(dark_green, dtype=np.float32)
+    light = np.asarray(light_green, dtype=np.float32)
+    green = lum[:, :, None] * (light - dark)
+    green += dark
+
+    # rgb * (1 - alpha) + green * alpha, exact at alpha 0 and 1
+    green *= alpha[:, :, None]
+    np.subtract(1, alpha, out=alpha)
+    rgb *= alpha[:, :, None]
+    rgb += green
+    return is_text
+
+
+def sample_background(rgb, corner=80):
+    """Mean colour of the top-left and top-right corner squares of an RGB band."""
+    corners = np.concatenate([
+        rgb[:corner, :corner].reshape(-1, 3),
+        rgb[:corner, -corner:].reshape(-1, 3),
+    ])
+    return np.mean(corners, axis=0)
+
+
+def fix_text_color(arr, band=0.12, corner=80, radius=TITLE_PARAMS['radius'],
+                   soft_radius=TITLE_PARAMS['soft_radius'], log=print, title=TITLE_PARAMS):
+    """Recolor and outline the title in the top `band` of a uint8 image, in place."""
+    h = arr.shape[0]
+    # Only the text band is touched, so only it is converted to float
+    text_end = int(h * band)
+    region = arr[:text_end].astype(np.float32)
+
+    # ============================================
+    # STEP 1: Replace rainbow colors with green
+    # ============================================
+
+    # Sample background from corners
+    rgb = region[:, :, :3]
+    bg_mean = sample_background(rgb, corner)
+    log(f'Background: RGB({bg_mean[0]:.0f},{bg_mean[1]:.0f},{bg_mean[2]:.0f})')
+
+    with span('recolor'):
+        is_text = recolor_text(region, bg_mean, title=title)
+    text_count = np.count_nonzero(is_text)
+    note(text_pixels=text_count)
+    log(f'Text pixels: {text_count}')
+
+    # ============================================
+    # STEP 2: Add white outline/shadow effect
+    # ============================================
+    log('Adding white outline...')
+
+    with span('outline'):
+        # Re-detect text in the now-green region (the green text pixels)
+        text_mask = bg_distance(rgb, bg_mean) > 20
+
+        # Outline zone: everything within radius of the text, plus a soft edge
+        # (gradient from white to transparent) out to soft_radius
+        add_outline(region, text_mask, radius, soft_radius)
+
+    arr[:text_end] = region
+    return arr
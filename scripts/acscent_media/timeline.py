@@ -0,0 +1,179 @@
+"""Declarative animation timelines rendered from numbered source frames.
+
+A timeline spec (JSON, or YAML when PyYAML is installed) lists segments:
+  hold      {"frame": n}                   one source frame held still
+  retime    {"from": a, "to": b, "ease"}   source range stretched to the duration
+  reverse   {"from": a, "to": b, "ease"}   same, played from b back to a
+  crossfade {"from": a, "to": b, "ease"}   dissolve from frame a to frame b
+Each segment takes "duration" in seconds at the spec's fps (or an explicit "frames" count).
+retime, reverse and crossfade also take "interpolate": "blend" (cross-fade the
+neighbouring frames, the default) or "motion" (motion-compensated, see motion.py).
+
+Segments yield (key, frame) pairs. Source frames carry their frame number as
+key, blends carry None, so sinks can write every unique frame only once.
+"""
+import numpy as np
+import json
+
+from .framestore import open_frames
+from .instrument import span
+from .motion import MotionInterpolator
+
+INTERPOLATIONS = ('blend', 'motion')
+
+EASINGS = {
+    'linear': lambda x: x,
+    'ease-in': lambda x: x * x,
+    'ease-out': lambda x: x * (2 - x),
+    'ease-in-out': lambda x: x * x * (3 - 2 * x),
+}
+
+
+def retime_plan(num_source, num_target, ease='linear'):
+    """Source index and 8-bit blend weight toward the next source frame, per target frame."""
+    if num_target > 1:
+        t = np.arange(num_target) / (num_target - 1)
+    else:
+        # A single target frame shows the first source frame; zero frames give empty arrays
+        t = np.zeros(num_target)
+    src_pos = np.clip(EASINGS[ease](t), 0, 1) * (num_source - 1)
+    src_idx = np.minimum(src_pos.astype(np.int64), num_source - 1)
+    frac = src_pos - src_idx
+
+    weight = np.rint(frac * 256).astype(np.uint16)
+    # Use the exact source frame when the blend would be invisible
+    weight[(frac < 0.01) | (src_idx >= num_source - 1)] = 0
+    return src_idx, weight
+
+
+def retime(frames, num_target, keys, ease='linear', chunk=16, interpolate='blend'):
+    """Stretch a (N, H, W, 3) source array to num_target frames, blending neighbours.
+
+    Blends are computed in 8.8 fixed point for a whole chunk of target frames at
+    once, so memory is bounded by the source array plus one chunk. With
+    interpolate='motion', in-between frames are motion-compensated instead.
+    """
+    num_source = len(frames)
+    src_idx, weight = retime_plan(num_source, num_target, ease)
+    next_idx = np.minimum(src_idx + 1, num_source - 1)
+    if interpolate == 'motion':
+        yield from _retime_motion(frames, keys, src_idx, next_idx, weight)
+        return
+
+    for start in range(0, num_target, chunk):
+        stop = min(start + chunk, num_target)
+        blend_at = start + np.flatnonzero(weight[start:stop])
+        blended = {}
+        if blend_at.size:
+            with span('blend', frames=int(blend_at.size)):
+                w = weight[blend_at][:, None, None, None]
+                acc = frames[src_idx[blend_at]].astype(np.uint16)
+                acc *= 256 - w
+                nxt = frames[next_idx[blend_at]].astype(np.uint16)
+                nxt *= w
+                acc += nxt
+                acc += 128
+                acc >>= 8
+                blended = dict(zip(blend_at.tolist(), acc.astype(np.uint8)))
+
+        for t in range(start, stop):
+            if t in blended:
+                yield None, blended[t]
+            else:
+                yield keys[src_idx[t]], frames[src_idx[t]]
+
+
+def _retime_motion(frames, keys, src_idx, next_idx, weight):
+    motion = MotionInterpolator(frames)
+    for t in range(len(src_idx)):
+        if weight[t]:
+            yield None, motion.between(src_idx[t], next_idx[t], weight[t] / 256)
+        else:
+            yield keys[src_idx[t]], frames[src_idx[t]]
+
+
+def load_timeline(path):
+    with open(path, encoding='utf-8') as f:
+        if path.endswith(('.yaml', '.yml')):
+            try:
+                import yaml
+            except ImportError:
+                raise SystemExit('PyYAML is required for YAML timelines (pip install pyyaml)')
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+def segment_length(seg, fps):
+    if 'frames' in seg:
+        return int(seg['frames'])
+    return int(round(seg['duration'] * fps))
+
+
+def render_segment(seg, source, count, chunk=16, interpolate='blend'):
+    kind = seg['type']
+    ease = seg.get('ease', 'linear')
+    interpolate = seg.get('interpolate', interpolate)
+    if interpolate not in INTERPOLATIONS:
+        raise ValueError(f'Unknown interpolation: {interpolate!r}')
+
+    if kind == 'hold':
+        frame = source.read(seg['frame'])
+        for _ in range(count):
+            yield seg['frame'], frame
+    elif kind in ('retime', 'reverse'):
+        first, last = seg['from'], seg['to']
+        # Decoded once (PNG) or mapped without a copy (frame store)
+        with span('decode', frames=last - first + 1):
+            frames = source.read_range(first, last)
+        keys = list(range(first, last + 1))
+        if kind == 'reverse':
+            frames, keys = frames[::-1], keys[::-1]
+        yield from retime(frames, count, keys, ease, chunk, interpolate)
+    elif kind == 'crossfade':
+        frames = np.stack([source.read(seg['from']), source.read(seg['to'])])
+        yield from retime(frames, count, [seg['from'], seg['to']], ease, chunk, interpolate)
+    else:
+        raise ValueError(f'Unknown timeline segment type: {kind!r}')
+
+
+def coalesce(items):
+    """Group consecutive repeats of the same source frame into (key, frame, count) runs."""
+    run_key, run_frame, run_count = None, None, 0
+    for key, frame in items:
+        if run_count and key is not None and key == run_key:
+            run_count += 1
+            continue
+        if run_count:
+            yield run_key, run_frame, run_count
+        run_key, run_frame, run_count = key, frame, 1
+    if run_count:
+        yield run_key, run_frame, run_count
+
+
+def timeline_length(spec):
+    """Total output frames of spec."""
+    fps = spec.get('fps', 60)
+    return sum(segment_length(seg, fps) for seg in spec['segments'])
+
+
+def render_timeline(spec, proc_dir, sink, chunk=16, log=print, interpolate='blend'):
+    """Stream every segment of spec into sink. Returns the total frame count.
+
+    proc_dir is a PNG directory or a .npy frame store. interpolate applies to
+    segments that do not set their own.
+    """
+    fps = spec.get('fps', 60)
+    source = open_frames(proc_dir)
+    try:
+        for n, seg in enumerate(spec['segments'], 1):
+            count = segment_length(seg, fps)
+            with span('segment', type=seg['type'], frames=count):
+                items = render_segment(seg, source, count, chunk, interpolate)
+                for key, frame, run in coalesce(items):
+                    with span('encode', frames=run):
+                        sink.write(frame, run, key)
+            label = f'{seg["type"]}, {seg["label"]}' if 'label' in seg else seg['type']
+            log(f'Segment {n} ({label}): {count} frames')
+    finally:
+        sink.close()
+    return sink.count
@@ -0,0 +1,284 @@
+"""Threshold sweeps over cached mask features, instead of re-running the pipeline per guess.
+
+    python -m acscent_media tune paper --grid color_dist=12,18,24 --grid dark_offset=10,15,20
+    python -m acscent_media tune cursor --grid 'border_max=[80,60,60],[100,80,80]' --grid count_max=400,800
+    python -m acscent_media tune title --source "../public/images/back ground.png" --grid sat_min=0.08,0.12,0.16
+
+The costly per-pixel work (float conversion, brightness, colour distance from
+the paper average, HSV saturation, background distance) is done once per
+target and cached as .npy files keyed by the source pixels and the parameters
+the features depend on. Each parameter combination is then only threshold
+comparisons on memory-mapped features, spread over a process pool.
+
+Masks are compared before dilation, and every frame is measured as decoded:
+where the cursor and paper ranges overlap, the pipeline would run paper
+detection on the frame after cursor removal.
+"""
+from PIL import Image
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from scipy.ndimage import distance_transform_edt
+import hashlib
+import itertools
+import json
+import os
+
+from .framestore import open_frames
+from .frames import (
+    CURSOR_PARAMS, PAPER_PARAMS, paper_box, paper_features, paper_pixels, threshold_paper_text,
+)
+from .ops import bg_distance, channel_mask
+from .text_color import TITLE_PARAMS, sample_background, title_text_mask
+
+FEATURE_VERSION = 1
+
+# Per target: defaults, the parameters features depend on (part of the cache key,
+# not sweepable), and those the sweep may vary
+TARGETS = {
+    'cursor': {'params': CURSOR_PARAMS, 'fixed': (),
+               'sweep': ('last_frame', 'white_min', 'border_max', 'count_min', 'count_max')},
+    'paper': {'params': PAPER_PARAMS, 'fixed': ('bottom', 'margin'),
+              'sweep': ('first_frame', 'min_paper_pixels', 'dark_offset', 'color_dist', 'dark_brightness',
+                        'dark_color_dist', 'min_text_pixels')},
+    'title': {'params': dict(TITLE_PARAMS, band=0.12, corner=80), 'fixed': ('band', 'corner'),
+              'sweep': tuple(TITLE_PARAMS)},
+}
+
+
+# ============================================
+# Feature extraction and cache
+# ============================================
+
+def _cursor_features(source, numbers, params):
+    """The cursor search window of every frame, as in remove_cursor."""
+    crops = []
+    for i in numbers:
+        frame = source.read(i)
+        h, w = frame.shape[:2]
+        crops.append(frame[h // 3:h * 2 // 3, w // 4:w * 3 // 4, :3])
+    return {'crop': np.stack(crops)}, {}
+
+
+def _paper_features(source, numbers, params):
+    """Paper mask, its pixel count and mean level, and the per-pixel text features of every frame."""
+    top, bottom, left, right = paper_box(source.read(numbers[0]).shape, params)
+    features = {'is_paper': [], 'brightness': [], 'color_dist': [], 'green': []}
+    counts, levels = [], []
+    for i in numbers:
+        region = source.read(i)[top:bottom, left:right, :3].astype(np.float32)
+        is_paper = paper_pixels(region)
+        count = np.count_nonzero(is_paper)
+        # The paper average exists whenever there is any paper; min_paper_pixels is applied per combination
+        paper_avg = np.mean(region[is_paper], axis=0) if count else np.zeros(3, dtype=np.float32)
+        brightness, color_dist, green = paper_features(region, paper_avg)
+        for name, value in zip(features, (is_paper, brightness, color_dist, green)):
+            features[name].append(value)
+        counts.append(int(count))
+        levels.append(float(np.mean(paper_avg)))
+    arrays = {name: np.stack(values) for name, values in features.items()}
+    return arrays, {'paper_pixels': counts, 'paper_level': levels}
+
+
+def _title_features(image_path, params):
+    """The title band of the image with its val, sat and background distance, as in recolor_text."""
+    with Image.open(image_path) as img:
+        arr = np.array(img)
+    rgb = arr[:int(arr.shape[0] * params['band']), :, :3].astype(np.float32)
+    bg_mean = sample_background(rgb, params['corner'])
+    val = rgb.max(axis=2)
+    delta = val - rgb.min(axis=2)
+    sat = np.divide(delta, val, out=np.zeros_like(val), where=val > 0)
+    return {'rgb': rgb, 'val': val, 'sat': sat, 'bg_dist': bg_distance(rgb, bg_mean)}, {}
+
+
+def feature_key(target, source_bytes, params):
+    digest = hashlib.sha256()
+    digest.update(source_bytes)
+    fixed = {k: params[k] for k in TARGETS[target]['fixed']}
+    digest.update(json.dumps({'target': target, 'fixed': fixed, 'version': FEATURE_VERSION},
+                             sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def build_features(target, source_path, cache_dir, params=None, log=print):
+    """Extract (or reuse) the target's features for source_path. Returns the cache directory."""
+    params = dict(TARGETS[target]['params'], **(params or {}))
+    if target == 'title':
+        with open(source_path, 'rb') as f:
+            content = f.read()
+        numbers = [1]
+    else:
+        source = open_frames(source_path)
+        numbers = source.numbers()
+        if not numbers:
+            raise SystemExit(f'No frames found in {source_path}')
+        content = b''.join(bytes(source.frame_bytes(i)) for i in numbers)
+    key = feature_key(target, content, params)
+    path = os.path.join(cache_dir, f'{target}-{key[:16]}')
+    try:
+        with open(os.path.join(path, 'meta.json'), encoding='utf-8') as f:
+            if json.load(f)['key'] == key:
+                log(f'Features: {path} (cached)')
+                return path
+    except (OSError, ValueError, KeyError):
+        pass
+
+    log(f'Extracting {target} features from {source_path}...')
+    if target == 'title':
+        arrays, extra = _title_features(source_path, params)
+    elif target == 'cursor':
+        arrays, extra = _cursor_features(source, numbers, params)
+    else:
+        arrays, extra = _paper_features(source, numbers, params)
+    os.makedirs(path, exist_ok=True)
+    for name, value in arrays.items():
+        np.save(os.path.join(path, name + '.npy'), value)
+    # meta.json last: a cache directory without it is incomplete and gets rebuilt
+    with open(os.path.join(path, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(dict(extra, key=key, target=target, frames=numbers, arrays=sorted(arrays)), f)
+    log(f'Features: {path} ({sum(a.nbytes for a in arrays.values()) / 1024 / 1024:.1f} MiB)')
+    return path
+
+
+_loaded = {}
+
+
+def load_features(path):
+    """meta dict plus memory-mapped arrays, loaded once per process."""
+    if path not in _loaded:
+        with open(os.path.join(path, 'meta.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+        for name in meta['arrays']:
+            meta[name] = np.load(os.path.join(path, name + '.npy'), mmap_mode='r')
+        _loaded[path] = meta
+    return _loaded[path]
+
+
+# ============================================
+# Masks per parameter combination: a list of (frame, candidate pixels, applied
+# mask or None); candidates are counted before the size gate, None out of range
+# ============================================
+
+def cursor_masks(f, params):
+    masks = []
+    for k, i in enumerate(f['frames']):
+        if i > params['last_frame']:
+            masks.append((i, None, None))
+            continue
+        crop = f['crop'][k]
+        white = params['white_min']
+        is_cursor = channel_mask(crop, above=(white, white, white))
+        is_cursor |= channel_mask(crop, below=params['border_max'])
+        count = np.count_nonzero(is_cursor)
+        masks.append((i, count, is_cursor if params['count_min'] < count < params['count_max'] else None))
+    return masks
+
+
+def paper_masks(f, params):
+    masks = []
+    for k, i in enumerate(f['frames']):
+        if i < params['first_frame']:
+            masks.append((i, None, None))
+            continue
+        if f['paper_pixels'][k] <= params['min_paper_pixels']:
+            masks.append((i, 0, None))
+            continue
+        text = threshold_paper_text(f['is_paper'][k], f['brightness'][k], f['color_dist'][k], f['green'][k],
+                                    f['paper_level'][k], params)
+        count = np.count_nonzero(text)
+        masks.append((i, count, text if count > params['min_text_pixels'] else None))
+    return masks
+
+
+def title_masks(f, params):
+    text = title_text_mask(f['rgb'], f['val'], f['sat'], f['bg_dist'], params)
+    return [(1, np.count_nonzero(text), text)]
+
+
+MASKS = {'cursor': cursor_masks, 'paper': paper_masks, 'title': title_masks}
+
+
+def outline_pixels(text_mask, radius, soft_radius):
+    """Pixels the title outline would cover: (hard ring, soft ring)."""
+    if not text_mask.any():
+        return 0, 0
+    dist = distance_transform_edt(~text_mask)
+    hard = int(np.count_nonzero((dist > 0) & (dist <= radius)))
+    return hard, int(np.count_nonzero((dist > radius) & (dist <= soft_radius)))
+
+
+def mask_stats(target, masks, reference, params):
+    """Statistics of one combination's masks, with IoU against the reference (default) masks."""
+    counts = [int(np.count_nonzero(m)) for _, _, m in masks if m is not None]
+    candidates = [c for _, c, _ in masks if c is not None]
+    ious = []
+    for (_, _, m), (_, _, ref) in zip(masks, reference):
+        if m is None and ref is None:
+            continue
+        if m is None or ref is None:
+            ious.append(0.0)
+            continue
+        union = np.count_nonzero(m | ref)
+        ious.append(np.count_nonzero(m & ref) / union if union else 1.0)
+    stats = {
+        'candidates': round(float(np.mean(candidates)), 1) if candidates else 0,
+        'applied': len(counts),
+        'total_pixels': sum(counts),
+        'mean_pixels': round(sum(counts) / len(counts), 1) if counts else 0,
+        'max_pixels': max(counts, default=0),
+        'iou': round(float(np.mean(ious)), 4) if ious else 1.0,
+    }
+    if target == 'title':
+        stats['outline_pixels'], stats['soft_pixels'] = outline_pixels(
+            masks[0][2], params['radius'], params['soft_radius'])
+    return stats
+
+
+def _evaluate_job(job):
+    target, path, combos, defaults = job
+    f = load_features(path)
+    reference = MASKS[target](f, defaults)
+    return [mask_stats(target, MASKS[target](f, params), reference, params) for params in combos]
+
+
+# ============================================
+# Sweep
+# ============================================
+
+def expand_grid(defaults, grid):
+    """Every combination of the grid's values ({name: [values]}) over the defaults."""
+    names = list(grid)
+    return [dict(defaults, **dict(zip(names, values))) for values in itertools.product(*grid.values())]
+
+
+def sweep(target, path, grid, params=None, workers=1, chunk=8):
+    """Evaluate every grid combination on the cached features. Returns [(swept values, stats)]."""
+    unknown = sorted(set(grid) - set(TARGETS[target]['sweep']))
+    if unknown:
+        raise SystemExit(f'{target}: cannot sweep {", ".join(unknown)} '
+                         f'(choose from {", ".join(TARGETS[target]["sweep"])})')
+    defaults = dict(TARGETS[target]['params'], **(params or {}))
+    combos = expand_grid(defaults, grid)
+    jobs = [(target, path, combos[k:k + chunk], defaults) for k in range(0, len(combos), chunk)]
+    if workers <= 1 or len(jobs) == 1:
+        results = map(_evaluate_job, jobs)
+        stats = [s for batch in results for s in batch]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            stats = [s for batch in pool.map(_evaluate_job, jobs) for s in batch]
+    return [({name: combo[name] for name in grid}, s) for combo, s in zip(combos, stats)]
+
+
+def format_table(target, grid, rows, defaults):
+    names = list(grid)
+    columns = ['candidates', 'applied', 'mean_pixels', 'max_pixels', 'iou']
+    if target == 'title':
+        columns = ['total_pixels', 'outline_pixels', 'soft_pixels', 'iou']
+    widths = [max(len(name), *(len(json.dumps(values[name])) for values, _ in rows)) for name in names]
+    header = '  '.join(f'{name:>{w}}' for name, w in zip(names, widths))
+    lines = ['  ' + header + ''.join(f'  {c:>12}' for c in columns)]
+    for values, stats in rows:
+        mark = '*' if all(values[name] == defaults[name] for name in names) else ' '
+        cells = '  '.join(f'{json.dumps(values[name]):>{w}}' for name, w in zip(names, widths))
+        lines.append(f'{mark} {cells}' + ''.join(f'  {stats[c]:>12}' for c in columns))
+    return lines
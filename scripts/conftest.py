@@ -0,0 +1 @@
+"""pytest configuration: puts scripts/ on sys.path so tests import acscent_media and page_inspect."""
@@ -0,0 +1,13 @@
+"""Browser checks for the Next.js pages, run against a local `next dev` / `next start` server.
+
+Run from the scripts/ directory (needs `pip install playwright && playwright install chromium`):
+    python -m page_inspect dom --route /analyzing/test-123 --viewports all
+    python -m page_inspect dom --serve dev --route / --route /admin --viewports 375x667,1440x900 --details
+    python -m page_inspect perf --serve start --viewports iphone-12 --cpu-throttle 4 --network fast-3g --channel chrome
+
+inspect_analyzing.py and inspect_dot.py are thin wrappers over `dom`.
+"""
+from .dom import INSPECT_JS, READY_JS, VIEWPORTS, session_script
+from .inspector import inspect_all, open_page
+from .perf import MEDIA_ASSETS, NETWORKS, capture_all
+from .server import local_server
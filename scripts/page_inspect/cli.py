@@ -0,0 +1,191 @@
+"""Command line entry point: python -m page_inspect <command> [options]."""
+import argparse
+import asyncio
+import json
+import time
+
+from .dom import VIEWPORTS
+from .inspector import inspect_all
+from .perf import MEDIA_ASSETS, NETWORKS, PERF_SESSION, capture_all
+from .server import DEFAULT_URL, local_server
+
+FINDINGS = ('small', 'left_edge', 'green', 'circles')
+
+# perf defaults: home, analyzing (with a seeded upload) and result (with a seeded result) pages
+PERF_ROUTES = ['/', '/analyzing/perf', '/results/perf']
+
+
+def parse_viewports(text):
+    """'all', preset names from dom.VIEWPORTS and/or WxH sizes, comma-separated."""
+    sizes = []
+    for item in text.split(','):
+        item = item.strip()
+        if item == 'all':
+            sizes.extend(VIEWPORTS.values())
+        elif item in VIEWPORTS:
+            sizes.append(VIEWPORTS[item])
+        else:
+            try:
+                w, h = item.lower().split('x')
+                sizes.append((int(w), int(h)))
+            except ValueError:
+                raise argparse.ArgumentTypeError(f'{item!r} is not WxH or one of: all, {", ".join(VIEWPORTS)}')
+    return list(dict.fromkeys(sizes))
+
+
+def parse_session(items):
+    session = {}
+    for item in items or []:
+        key, sep, value = item.partition('=')
+        if not sep:
+            raise SystemExit(f'--session expects KEY=VALUE, got {item!r}')
+        session[key] = value
+    return session
+
+
+def print_details(report):
+    for name in FINDINGS + ('body_children',):
+        print(f'\n=== {report["route"]} {report["viewport"][0]}x{report["viewport"][1]}: {name} '
+              f'({len(report[name])} found) ===')
+        for item in report[name]:
+            print(json.dumps(item, indent=2, ensure_ascii=False))
+
+
+def cmd_dom(args):
+    start = time.perf_counter()
+    with local_server(args.serve, args.base_url):
+        reports = asyncio.run(inspect_all(
+            args.base_url, args.route, args.viewports, args.concurrency,
+            session=parse_session(args.session), ready_selector=args.ready_selector,
+            quiet_ms=args.quiet_ms, timeout_ms=args.timeout * 1000, screenshots=args.screenshots,
+            channel=args.channel,
+        ))
+    elapsed = time.perf_counter() - start
+
+    print(f'{"route":<28} {"viewport":>9} {"elements":>8} {"styled":>6} {"small":>5} {"left":>4} '
+          f'{"green":>5} {"circle":>6} {"ready ms":>9} {"scan ms":>8}')
+    for r in reports:
+        size = f'{r["viewport"][0]}x{r["viewport"][1]}'
+        if 'error' in r:
+            print(f'{r["route"]:<28} {size:>9}  ERROR {r["error"]}')
+            continue
+        print(f'{r["route"]:<28} {size:>9} {r["elements"]:>8} {r["styled"]:>6} {len(r["small"]):>5} '
+              f'{len(r["left_edge"]):>4} {len(r["green"]):>5} {len(r["circles"]):>6} '
+              f'{r["ready_ms"]:>9.0f} {r["inspect_ms"]:>8.1f}')
+    print(f'{len(reports)} pages in {elapsed:.1f}s')
+
+    if args.details:
+        for r in reports:
+            if 'error' not in r:
+                print_details(r)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(reports, f, indent=1, ensure_ascii=False)
+        print(f'Saved: {args.output}')
+    return 1 if any('error' in r for r in reports) else 0
+
+
+def _ms(value):
+    return f'{value:.0f}' if value is not None else '-'
+
+
+def cmd_perf(args):
+    session = dict(PERF_SESSION)
+    session.update(parse_session(args.session))
+    with local_server(args.serve, args.base_url):
+        reports = asyncio.run(capture_all(
+            args.base_url, args.route or PERF_ROUTES, args.viewports, args.runs, args.concurrency,
+            session=session, ready_selector=args.ready_selector, quiet_ms=args.quiet_ms,
+            timeout_ms=args.timeout * 1000, channel=args.channel, block=args.block or ['**/api/**'],
+            api_delay_ms=args.api_delay * 1000,
+            network=args.network, cpu_throttle=args.cpu_throttle, assets=args.asset or MEDIA_ASSETS,
+            sample_ms=args.sample_ms,
+        ))
+
+    print(f'Medians of {args.runs} cold runs (network: {args.network}, CPU throttle: {args.cpu_throttle}x)')
+    print(f'{"route":<20} {"viewport":>9} {"ttfb":>6} {"fcp":>6} {"lcp":>6} {"load":>6} {"cls":>6} {"tbt":>6} '
+          f'{"tasks":>5} {"KiB":>7} {"media KiB":>9}  lcp element')
+    for r in reports:
+        size = f'{r["viewport"][0]}x{r["viewport"][1]}'
+        if not r['runs']:
+            print(f'{r["route"]:<20} {size:>9}  ERROR {r["errors"][0]}')
+            continue
+        media = (r['bytes'].get('Media') or 0) + (r['bytes'].get('Image') or 0)
+        print(f'{r["route"]:<20} {size:>9} {_ms(r["ttfb"]):>6} {_ms(r["fcp"]):>6} {_ms(r["lcp"]):>6} '
+              f'{_ms(r["load"]):>6} {r["cls"]:>6.3f} {_ms(r["tbt"]):>6} {r["long_tasks"]:>5.0f} '
+              f'{r["total_bytes"] / 1024:>7.0f} {media / 1024:>9.0f}  {r["lcp_element"] or "-"}')
+
+    for r in reports:
+        if not r['runs']:
+            continue
+        print(f'\n{r["route"]} {r["viewport"][0]}x{r["viewport"][1]}')
+        print('  bytes: ' + ', '.join(f'{kind} {n / 1024:.0f} KiB' for kind, n in r['bytes'].items()))
+        for m in r['media']:
+            if m.get('error'):
+                print(f'  {m["url"]}: {m["error"]}')
+            elif m['kind'] == 'video':
+                print(f'  {m["url"]}: {m["bytes"] / 1024:.0f} KiB, first frame {m["first_frame_ms"]:.1f} ms, '
+                      f'{m["decoded_fps"]:.0f} fps decoded, {m["dropped_frames"]:.0f} dropped')
+            else:
+                print(f'  {m["url"]}: {m["bytes"] / 1024:.0f} KiB, decode {m["decode_ms"]:.1f} ms')
+        if r['errors']:
+            print(f'  {len(r["errors"])} failed runs, first: {r["errors"][0]}')
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(reports, f, indent=1, ensure_ascii=False)
+        print(f'Saved: {args.output}')
+    return 1 if any(not r['runs'] for r in reports) else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='page_inspect', description='AC\'SCENT page inspection against a local server')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    # Options shared by every command that drives a browser
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--base-url', default=DEFAULT_URL, help='local Next.js server')
+    common.add_argument('--serve', choices=('dev', 'start'),
+                        help='start `next dev` / `next start` for the run (default: use a running server)')
+    common.add_argument('--route', action='append', help='path to visit; repeatable (default: /)')
+    common.add_argument('--viewports', type=parse_viewports, default=[VIEWPORTS['app']],
+                        help=f'comma-separated WxH or presets ({", ".join(VIEWPORTS)}), or all (default: app)')
+    common.add_argument('--concurrency', type=int, default=4, help='pages open at the same time')
+    common.add_argument('--session', action='append', metavar='KEY=VALUE',
+                        help='sessionStorage item set before the page loads; repeatable')
+    common.add_argument('--ready-selector', help='also wait until this selector is visible')
+    common.add_argument('--quiet-ms', type=int, default=300,
+                        help='ready once the DOM structure is unchanged for this long')
+    common.add_argument('--timeout', type=float, default=10, help='seconds allowed for loading and settling')
+    common.add_argument('--output', help='write the full reports as JSON')
+    common.add_argument('--channel', help="browser channel, e.g. chrome (Playwright's Chromium cannot play H.264)")
+
+    p = commands.add_parser('dom', parents=[common],
+                            help='small, left-edge and green elements, SVG circles and body children per page')
+    p.add_argument('--screenshots', help='directory for one screenshot per route and viewport')
+    p.add_argument('--details', action='store_true', help='print every finding, not just the counts')
+    p.set_defaults(func=cmd_dom)
+
+    p = commands.add_parser('perf', parents=[common],
+                            help='navigation timing, LCP/CLS, long tasks, bytes per type and media decode cost')
+    p.add_argument('--runs', type=int, default=5, help='cold loads per route and viewport; medians are reported')
+    p.add_argument('--network', choices=sorted(NETWORKS), default='none', help='network throttling preset')
+    p.add_argument('--cpu-throttle', type=float, default=1, help='CPU slowdown factor (4 is a mid-range phone)')
+    p.add_argument('--asset', action='append',
+                   help=f'media path to decode on every page; repeatable (default: {", ".join(MEDIA_ASSETS)})')
+    p.add_argument('--sample-ms', type=int, default=1000, help='video playback sampled for decoded fps')
+    p.add_argument('--block', action='append', metavar='GLOB',
+                   help='request URLs to abort; repeatable (default: **/api/**, so no real API calls)')
+    p.add_argument('--api-delay', type=float, default=30,
+                   help='seconds /api/analyze-image is held before answering with a fixture result '
+                        '(default: longer than a run, so /analyzing stays on its animation)')
+    p.set_defaults(func=cmd_perf, concurrency=1)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.func is cmd_dom:
+        args.route = args.route or ['/']
+    return args.func(args) or 0
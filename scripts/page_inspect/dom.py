@@ -0,0 +1,122 @@
+"""In-page JavaScript: readiness wait, session seeding and the single-pass element checks."""
+import json
+
+# Viewports checked by default with --viewports all (width, height)
+VIEWPORTS = {
+    'iphone-se': (375, 667),
+    'galaxy-s8': (360, 740),
+    'iphone-12': (390, 844),
+    'iphone-xr': (414, 896),
+    'iphone-15-max': (430, 932),
+    'narrow': (320, 568),
+    'app': (500, 900),
+    'ipad': (768, 1024),
+    'laptop': (1280, 800),
+    'desktop': (1440, 900),
+}
+
+# Resolves once web fonts are loaded and the DOM structure has not changed for
+# quietMs (capped at timeoutMs), then waits two frames so layout and paint are
+# done. Only childList/characterData are observed: framer-motion rewrites style
+# attributes on every frame, which would keep the page from ever going quiet.
+READY_JS = '''async ({quietMs, timeoutMs}) => {
+    const start = performance.now();
+    await document.fonts.ready;
+    await new Promise(resolve => {
+        let timer = null;
+        const observer = new MutationObserver(() => {
+            clearTimeout(timer);
+            timer = setTimeout(done, quietMs);
+        });
+        const cap = setTimeout(done, Math.max(0, timeoutMs - (performance.now() - start)));
+        function done() {
+            observer.disconnect();
+            clearTimeout(timer);
+            clearTimeout(cap);
+            resolve();
+        }
+        observer.observe(document.documentElement, {subtree: true, childList: true, characterData: true});
+        timer = setTimeout(done, quietMs);
+    });
+    await new Promise(resolve => requestAnimationFrame(() => requestAnimationFrame(resolve)));
+    return performance.now() - start;
+}'''
+
+# One traversal for every check. Geometry comes first and computed style is only
+# requested for elements whose box can match (small, or near the left edge), so
+# getComputedStyle runs on a handful of elements instead of all of them three times.
+INSPECT_JS = '''() => {
+    const start = performance.now();
+    const box = r => ({x: Math.round(r.x), y: Math.round(r.y), w: Math.round(r.width), h: Math.round(r.height)});
+    const cls = el => (el.className?.toString?.() || '').substring(0, 100);
+    const isGreen = c => {
+        const m = c.match(/rgb\\((\\d+),\\s*(\\d+),\\s*(\\d+)/);
+        if (!m) return false;
+        const [r, g, b] = [parseInt(m[1]), parseInt(m[2]), parseInt(m[3])];
+        return g > r * 1.2 && g > b * 1.2 && g > 50;
+    };
+
+    const small = [], leftEdge = [], green = [], circles = [];
+    let elements = 0, styled = 0;
+    for (const el of document.querySelectorAll('*')) {
+        elements++;
+        const rect = el.getBoundingClientRect();
+        if (el.tagName === 'circle') {
+            circles.push({
+                cx: el.getAttribute('cx'), cy: el.getAttribute('cy'), r: el.getAttribute('r'),
+                fill: el.getAttribute('fill'), rect: box(rect),
+            });
+        }
+        if (rect.width === 0 || rect.height === 0) continue;
+        const isSmall = rect.width < 30 && rect.height < 30;
+        const nearLeft = rect.x < 30;
+        if (!isSmall && !nearLeft) continue;
+
+        const style = getComputedStyle(el);
+        styled++;
+        const shown = style.display !== 'none' && style.visibility !== 'hidden';
+        if (isSmall && shown) {
+            small.push({
+                tag: el.tagName, rect: box(rect), color: style.color, bgColor: style.backgroundColor,
+                border: style.border, opacity: style.opacity, outerHTML: el.outerHTML.substring(0, 300),
+            });
+        }
+        if (rect.x < 20 && rect.width < 50 && rect.height < 50 && shown && style.opacity !== '0') {
+            leftEdge.push({
+                tag: el.tagName, id: el.id, className: cls(el), rect: box(rect), color: style.color,
+                bgColor: style.backgroundColor, borderColor: style.borderColor,
+                content: el.textContent?.substring(0, 50) || '', outerHTML: el.outerHTML.substring(0, 200),
+            });
+        }
+        if (nearLeft && (isGreen(style.color) || isGreen(style.backgroundColor))) {
+            green.push({
+                tag: el.tagName, id: el.id, className: cls(el), rect: box(rect), color: style.color,
+                bgColor: style.backgroundColor, outerHTML: el.outerHTML.substring(0, 300),
+            });
+        }
+    }
+
+    const bodyChildren = Array.from(document.body.children).map(el => {
+        const rect = el.getBoundingClientRect();
+        const style = getComputedStyle(el);
+        return {
+            tag: el.tagName, id: el.id, className: cls(el), rect: box(rect), display: style.display,
+            visibility: style.visibility, opacity: style.opacity,
+            visible: rect.width > 0 && rect.height > 0 && style.display !== 'none',
+            innerHTML_length: el.innerHTML.length, text: el.textContent?.substring(0, 100) || '',
+        };
+    });
+
+    return {
+        elements, styled, small, left_edge: leftEdge, green, circles, body_children: bodyChildren,
+        inspect_ms: performance.now() - start,
+    };
+}'''
+
+
+def session_script(items):
+    """Init script putting items into sessionStorage before any page script runs."""
+    return f'''(() => {{
+    const items = {json.dumps(items, ensure_ascii=False)};
+    for (const [key, value] of Object.entries(items)) sessionStorage.setItem(key, value);
+}})();'''
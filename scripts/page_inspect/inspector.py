@@ -0,0 +1,99 @@
+"""Concurrent DOM inspection: every (route, viewport) in its own context of one browser."""
+import asyncio
+import os
+import re
+import time
+
+from .dom import INSPECT_JS, READY_JS, session_script
+
+
+def import_playwright():
+    try:
+        from playwright.async_api import async_playwright
+    except ImportError:
+        raise SystemExit('Playwright is required (pip install playwright && playwright install chromium)')
+    return async_playwright
+
+
+def target_name(route, viewport):
+    slug = re.sub(r'[^A-Za-z0-9]+', '_', route).strip('_') or 'home'
+    return f'{slug}_{viewport[0]}x{viewport[1]}'
+
+
+async def launch_browser(p, channel=None):
+    """Headless Chromium, or an installed Chrome with channel='chrome' (needed for H.264 video)."""
+    return await p.chromium.launch(headless=True, channel=channel)
+
+
+async def open_page(browser, base_url, route, viewport, session=None, ready_selector=None, quiet_ms=300,
+                    timeout_ms=10000, prepare=None):
+    """New context and page at base_url + route, loaded and settled. Returns (context, page, timings).
+
+    prepare(context, page) is awaited before navigating, to install observers or throttling.
+    The context is closed here if the page fails to load; once returned, the caller closes it.
+    """
+    context = await browser.new_context(viewport={'width': viewport[0], 'height': viewport[1]})
+    try:
+        if session:
+            await context.add_init_script(session_script(session))
+        page = await context.new_page()
+        if prepare is not None:
+            await prepare(context, page)
+        start = time.perf_counter()
+        await page.goto(base_url + route, wait_until='load', timeout=timeout_ms)
+        loaded = time.perf_counter()
+        if ready_selector:
+            await page.wait_for_selector(ready_selector, state='visible', timeout=timeout_ms)
+        await page.evaluate(READY_JS, {'quietMs': quiet_ms, 'timeoutMs': timeout_ms})
+    except BaseException:
+        await context.close()
+        raise
+    timings = {
+        'load_ms': round((loaded - start) * 1000, 1),
+        'ready_ms': round((time.perf_counter() - start) * 1000, 1),
+    }
+    return context, page, timings
+
+
+async def inspect_target(browser, semaphore, base_url, route, viewport, options):
+    report = {'route': route, 'viewport': list(viewport)}
+    async with semaphore:
+        context = None
+        try:
+            context, page, timings = await open_page(
+                browser, base_url, route, viewport, options.get('session'), options.get('ready_selector'),
+                options.get('quiet_ms', 300), options.get('timeout_ms', 10000),
+            )
+            report.update(timings)
+            report.update(await page.evaluate(INSPECT_JS))
+            report['inspect_ms'] = round(report['inspect_ms'], 1)
+            if options.get('screenshots'):
+                path = os.path.join(options['screenshots'], target_name(route, viewport) + '.png')
+                await page.screenshot(path=path, full_page=False)
+                report['screenshot'] = path
+        except Exception as e:     # one broken target must not sink the rest of the sweep
+            report['error'] = f'{type(e).__name__}: {e}'
+        finally:
+            if context is not None:
+                await context.close()
+    return report
+
+
+async def inspect_all(base_url, routes, viewports, concurrency=4, **options):
+    """Inspect every route at every viewport, at most `concurrency` pages at a time.
+
+    options: session (sessionStorage items), ready_selector, quiet_ms, timeout_ms,
+    screenshots (directory), channel. Returns one report per target, in input order.
+    """
+    if options.get('screenshots'):
+        os.makedirs(options['screenshots'], exist_ok=True)
+    async with import_playwright()() as p:
+        browser = await launch_browser(p, options.get('channel'))
+        try:
+            semaphore = asyncio.Semaphore(concurrency)
+            return await asyncio.gather(*(
+                inspect_target(browser, semaphore, base_url, route, viewport, options)
+                for route in routes for viewport in viewports
+            ))
+        finally:
+            await browser.close()
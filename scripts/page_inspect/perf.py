@@ -0,0 +1,317 @@
+"""Page performance capture: navigation timing, web vitals, bytes per asset type and media decode cost.
+
+Every run is a cold load in a fresh context. Metrics are reported as the
+median over runs; runs default to one page at a time, since concurrent pages
+would compete for the CPU and skew each other's timings.
+"""
+import asyncio
+import json
+import statistics
+
+from .inspector import import_playwright, launch_browser, open_page
+
+# Large animation assets checked on every page even when the page has not requested them yet
+MEDIA_ASSETS = (
+    '/images/envelope2_close.mp4',
+    '/images/envelope2_cropped.mp4',
+    '/images/2_display.webp',
+    '/images/result_template_display.webp',
+)
+
+# What the analysis API answers on perf runs: the analyzing page receives it from the
+# stubbed /api/analyze-image, and the results page reads it from sessionStorage
+# (see PERF_SESSION). The perfume is AC'SCENT 01 from src/lib/data/perfumes.ts.
+ANALYZE_API = '**/api/analyze-image'
+PERF_ANALYSIS = {
+    'analysisId': 'perf',
+    'analysis': {
+        'description': '달콤하면서도 시크한 분위기의 인물',
+        'traits': {'sexy': 7, 'cute': 3, 'charisma': 8, 'darkness': 7, 'freshness': 4, 'elegance': 6,
+                   'freedom': 5, 'luxury': 7, 'purity': 2, 'uniqueness': 8},
+        'characteristics': {'citrus': 2, 'floral': 3, 'woody': 5, 'musky': 3, 'fruity': 7, 'spicy': 2},
+        'mood': ['시크함', '도시적', '매력적인'],
+        'personality': '유니크하고 달콤한 매력을 가진 사람',
+    },
+    'recommendations': [{
+        'perfume': {
+            'id': "AC'SCENT 01",
+            'name': '블랙베리',
+            'description': '달콤하고 진한 블랙베리 향이 매력적인 향수입니다. 달콤하면서도 약간의 시큼함이 있어 '
+                           '독특한 매력을 가지고 있습니다.',
+            'mood': '달콤한, 과일향, 상큼한, 매력적인',
+            'personality': '유니크하고 달콤한 매력을 가진 사람에게 어울립니다.',
+            'mainScent': {'name': '블랙베리'},
+            'subScent1': {'name': '월계수잎'},
+            'subScent2': {'name': '시더우드'},
+            'characteristics': {'citrus': 2, 'floral': 3, 'woody': 5, 'musky': 2, 'fruity': 7, 'spicy': 1},
+            'category': 'fruity',
+            'recommendation': '현대적이고 세련된 감각의 20-30대 남성에게 특히 잘 어울립니다.',
+            'traits': {'sexy': 7, 'cute': 2, 'charisma': 8, 'darkness': 9, 'freshness': 3, 'elegance': 6,
+                       'freedom': 5, 'luxury': 7, 'purity': 1, 'uniqueness': 8},
+            'keywords': ['시크함', '도시적', '미니멀', '관찰자', '무관심'],
+            'primaryColor': '#1E1E24',
+            'secondaryColor': '#420039',
+        },
+        'matchConfidence': 92,
+        'reasoning': '시크하고 유니크한 분위기가 블랙베리의 달콤하고 어두운 매력과 잘 맞습니다.',
+    }],
+}
+# 1x1 PNG standing in for an upload
+PERF_IMAGE = ('data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNk'
+              '+M9QDwADhgGAWjR9awAAAABJRU5ErkJggg==')
+# sessionStorage for the default perf routes: a pending upload for /analyzing/perf
+# and a stored result for /results/perf
+PERF_SESSION = {
+    'analysis-pending-perf': json.dumps({'uploadedImage': PERF_IMAGE}),
+    'analysis-perf': json.dumps(dict(PERF_ANALYSIS, uploadedImage=PERF_IMAGE), ensure_ascii=False),
+}
+
+# Chrome DevTools network presets: (download bytes/s, upload bytes/s, latency ms)
+NETWORKS = {
+    'none': None,
+    '4g': (4 * 1024 * 1024 / 8, 3 * 1024 * 1024 / 8, 20),
+    'fast-3g': (1.6 * 1024 * 1024 / 8 * 0.9, 750 * 1024 / 8 * 0.9, 150 * 3.75),
+    'slow-3g': (500 * 1024 / 8 * 0.8, 500 * 1024 / 8 * 0.8, 400 * 5),
+}
+
+# Installed before any page script: buffered observers for LCP, CLS and long tasks.
+# CLS is the largest session window (shifts < 1s apart, window < 5s), as in Core Web Vitals.
+OBSERVE_JS = '''(() => {
+    const perf = window.__acscentPerf = {lcp: null, lcpElement: null, cls: 0, longTasks: []};
+    const observe = (type, onEntry) => {
+        try {
+            new PerformanceObserver(list => list.getEntries().forEach(onEntry)).observe({type, buffered: true});
+        } catch (e) { /* entry type not supported by this browser */ }
+    };
+    observe('largest-contentful-paint', e => {
+        perf.lcp = e.startTime;
+        perf.lcpElement = e.element ? e.element.tagName + (e.url ? ' ' + e.url : '') : (e.url || null);
+    });
+    let windowValue = 0, windowStart = 0, lastShift = 0;
+    observe('layout-shift', e => {
+        if (e.hadRecentInput) return;
+        if (windowValue && e.startTime - lastShift < 1000 && e.startTime - windowStart < 5000) {
+            windowValue += e.value;
+        } else {
+            windowValue = e.value;
+            windowStart = e.startTime;
+        }
+        lastShift = e.startTime;
+        perf.cls = Math.max(perf.cls, windowValue);
+    });
+    observe('longtask', e => perf.longTasks.push([e.startTime, e.duration]));
+})();'''
+
+COLLECT_JS = '''() => {
+    const nav = performance.getEntriesByType('navigation')[0] || {};
+    const paint = Object.fromEntries(performance.getEntriesByType('paint').map(e => [e.name, e.startTime]));
+    const perf = window.__acscentPerf || {longTasks: []};
+    const fcp = paint['first-contentful-paint'] ?? null;
+    // Total blocking time: long-task time past 50 ms, after first contentful paint
+    const tbt = perf.longTasks
+        .filter(([start]) => fcp === null || start >= fcp)
+        .reduce((total, [, duration]) => total + Math.max(0, duration - 50), 0);
+    const media = new Set();
+    for (const el of document.querySelectorAll('img, video, source')) {
+        const src = el.currentSrc || el.src;
+        if (src && new URL(src, location.href).pathname.startsWith('/images/')) {
+            media.add(new URL(src, location.href).pathname);
+        }
+    }
+    return {
+        ttfb: nav.responseStart ?? null,
+        dom_content_loaded: nav.domContentLoadedEventEnd ?? null,
+        load: nav.loadEventEnd || null,
+        fcp,
+        lcp: perf.lcp,
+        lcp_element: perf.lcpElement,
+        cls: perf.cls,
+        long_tasks: perf.longTasks.length,
+        long_task_ms: perf.longTasks.reduce((total, [, duration]) => total + duration, 0),
+        tbt,
+        page_media: [...media],
+    };
+}'''
+
+# Decode cost without the network: each asset is fetched into a blob first, then
+# images are decoded with createImageBitmap and videos are timed to their first
+# frame and played for sampleMs to read the decoder's frame counters.
+MEDIA_JS = '''async ({urls, sampleMs}) => {
+    const results = [];
+    for (const url of urls) {
+        const result = {url};
+        try {
+            let start = performance.now();
+            const blob = await (await fetch(url)).blob();
+            result.bytes = blob.size;
+            result.fetch_ms = performance.now() - start;
+            if (blob.type.startsWith('video/')) {
+                result.kind = 'video';
+                const video = document.createElement('video');
+                video.muted = true;
+                video.playsInline = true;
+                video.preload = 'auto';
+                const objectUrl = URL.createObjectURL(blob);
+                start = performance.now();
+                video.src = objectUrl;
+                await new Promise((resolve, reject) => {
+                    video.onloadeddata = resolve;
+                    video.onerror = () => reject(new Error('media error ' + (video.error && video.error.code)));
+                });
+                result.first_frame_ms = performance.now() - start;
+                result.width = video.videoWidth;
+                result.height = video.videoHeight;
+                await video.play();
+                await new Promise(resolve => setTimeout(resolve, sampleMs));
+                const quality = video.getVideoPlaybackQuality();
+                result.decoded_fps = quality.totalVideoFrames / (video.currentTime || 1);
+                result.dropped_frames = quality.droppedVideoFrames;
+                video.pause();
+                URL.revokeObjectURL(objectUrl);
+            } else {
+                result.kind = 'image';
+                start = performance.now();
+                const bitmap = await createImageBitmap(blob);
+                result.decode_ms = performance.now() - start;
+                result.width = bitmap.width;
+                result.height = bitmap.height;
+                bitmap.close();
+            }
+        } catch (e) {
+            result.error = String(e);
+        }
+        results.push(result);
+    }
+    return results;
+}'''
+
+NAV_METRICS = ('ttfb', 'fcp', 'lcp', 'dom_content_loaded', 'load', 'cls', 'tbt', 'long_tasks', 'long_task_ms')
+MEDIA_METRICS = ('bytes', 'fetch_ms', 'decode_ms', 'first_frame_ms', 'decoded_fps', 'dropped_frames')
+
+
+class NetworkTally:
+    """Encoded bytes received per Chrome resource type, from CDP Network events."""
+
+    def __init__(self):
+        self.types = {}
+        self.bytes = {}
+
+    def on_response(self, event):
+        self.types[event['requestId']] = event.get('type', 'Other')
+
+    def on_finished(self, event):
+        kind = self.types.get(event['requestId'], 'Other')
+        self.bytes[kind] = self.bytes.get(kind, 0) + int(event.get('encodedDataLength', 0))
+
+
+async def capture_run(browser, base_url, route, viewport, options):
+    """One cold load of route. Returns a run dict, or {'error': ...}."""
+    tally = NetworkTally()
+
+    async def abort(request_route):
+        await request_route.abort()
+
+    async def analyze(request_route):
+        # Held like a slow analysis, so the loading animation is what gets measured
+        await asyncio.sleep(options.get('api_delay_ms', 30000) / 1000)
+        try:
+            await request_route.fulfill(status=200, content_type='application/json',
+                                        body=json.dumps({'success': True, 'data': PERF_ANALYSIS}))
+        except Exception:   # the run finished first and closed the context
+            pass
+
+    async def prepare(context, page):
+        await context.add_init_script(OBSERVE_JS)
+        for pattern in options.get('block', ()):
+            await context.route(pattern, abort)
+        # Registered last so it takes precedence over a blocking glob like **/api/**
+        await context.route(ANALYZE_API, analyze)
+        cdp = await context.new_cdp_session(page)
+        cdp.on('Network.responseReceived', tally.on_response)
+        cdp.on('Network.loadingFinished', tally.on_finished)
+        await cdp.send('Network.enable')
+        await cdp.send('Network.setCacheDisabled', {'cacheDisabled': True})
+        network = NETWORKS[options.get('network', 'none')]
+        if network is not None:
+            down, up, latency = network
+            await cdp.send('Network.emulateNetworkConditions', {
+                'offline': False, 'downloadThroughput': down, 'uploadThroughput': up, 'latency': latency,
+            })
+        if options.get('cpu_throttle', 1) > 1:
+            await cdp.send('Emulation.setCPUThrottlingRate', {'rate': options['cpu_throttle']})
+
+    context = None
+    try:
+        context, page, timings = await open_page(
+            browser, base_url, route, viewport, options.get('session'), options.get('ready_selector'),
+            options.get('quiet_ms', 300), options.get('timeout_ms', 10000), prepare,
+        )
+        run = await page.evaluate(COLLECT_JS)
+        run.update(timings)
+        run['bytes'] = dict(tally.bytes)
+        urls = list(dict.fromkeys(run.pop('page_media') + list(options.get('assets', MEDIA_ASSETS))))
+        run['media'] = await page.evaluate(MEDIA_JS, {'urls': urls, 'sampleMs': options.get('sample_ms', 1000)})
+        return run
+    except Exception as e:     # keep the other runs' numbers
+        return {'error': f'{type(e).__name__}: {e}'}
+    finally:
+        if context is not None:
+            await context.close()
+
+
+def median_of(values):
+    values = [v for v in values if v is not None]
+    return statistics.median(values) if values else None
+
+
+def summarize(route, viewport, runs):
+    """Median of every metric over the successful runs."""
+    ok = [r for r in runs if 'error' not in r]
+    report = {'route': route, 'viewport': list(viewport), 'runs': len(ok),
+              'errors': [r['error'] for r in runs if 'error' in r]}
+    if not ok:
+        return report
+    for key in NAV_METRICS + ('load_ms', 'ready_ms'):
+        report[key] = median_of(r.get(key) for r in ok)
+    report['lcp_element'] = statistics.mode(r.get('lcp_element') for r in ok)
+    kinds = sorted({kind for r in ok for kind in r['bytes']})
+    report['bytes'] = {kind: median_of(r['bytes'].get(kind, 0) for r in ok) for kind in kinds}
+    report['total_bytes'] = median_of(sum(r['bytes'].values()) for r in ok)
+
+    media = {}
+    for r in ok:
+        for m in r['media']:
+            media.setdefault(m['url'], []).append(m)
+    report['media'] = []
+    for url, samples in media.items():
+        entry = {'url': url, 'kind': samples[0].get('kind')}
+        for key in MEDIA_METRICS:
+            entry[key] = median_of(s.get(key) for s in samples)
+        errors = [s['error'] for s in samples if 'error' in s]
+        if errors:
+            entry['error'] = errors[0]
+        report['media'].append(entry)
+    return report
+
+
+async def capture_all(base_url, routes, viewports, runs=5, concurrency=1, **options):
+    """Capture `runs` cold loads of every route at every viewport. Returns one median report per target.
+
+    options: session, ready_selector, quiet_ms, timeout_ms, channel, block (URL globs
+    to abort), api_delay_ms (before the analysis API answers with PERF_ANALYSIS),
+    network (key of NETWORKS), cpu_throttle, assets, sample_ms.
+    """
+    async with import_playwright()() as p:
+        browser = await launch_browser(p, options.get('channel'))
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one(route, viewport):
+            async with semaphore:
+                return await capture_run(browser, base_url, route, viewport, options)
+
+        try:
+            targets = [(route, viewport) for route in routes for viewport in viewports]
+            results = await asyncio.gather(*(one(r, v) for r, v in targets for _ in range(runs)))
+        finally:
+            await browser.close()
+    return [summarize(r, v, results[k * runs:(k + 1) * runs]) for k, (r, v) in enumerate(targets)]
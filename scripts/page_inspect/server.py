@@ -0,0 +1,65 @@
+"""The local Next.js server the inspectors run against."""
+from contextlib import contextmanager
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlparse
+from urllib.request import urlopen
+import os
+import signal
+import subprocess
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_URL = 'http://localhost:3000'
+
+
+def is_up(url):
+    try:
+        with urlopen(url, timeout=2):
+            return True
+    except HTTPError:
+        return True     # the server answered, even if not with 200
+    except (URLError, OSError):
+        return False
+
+
+def wait_until_up(url, timeout, proc=None):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if is_up(url):
+            return
+        if proc is not None and proc.poll() is not None:
+            raise SystemExit(f'The Next.js server exited with code {proc.returncode}')
+        time.sleep(0.5)
+    raise SystemExit(f'{url} did not respond within {timeout:.0f}s')
+
+
+@contextmanager
+def local_server(mode, base_url=DEFAULT_URL, timeout=120):
+    """Start `next dev` or `next start` (mode 'dev'/'start') for the block; mode None uses a running server.
+
+    `next start` needs a prior `npm run build`.
+    """
+    if mode is None:
+        if not is_up(base_url):
+            raise SystemExit(f'No server at {base_url}: run `npm run dev` or pass --serve dev')
+        yield
+        return
+
+    port = str(urlparse(base_url).port or 3000)
+    cmd = ['npx', 'next', mode, '-p', port]
+    # Own process group, so stopping it also stops the workers next spawns
+    kwargs = {'start_new_session': True} if os.name == 'posix' else {}
+    proc = subprocess.Popen(cmd, cwd=REPO_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, **kwargs)
+    try:
+        wait_until_up(base_url, timeout, proc)
+        yield
+    finally:
+        if proc.poll() is None:
+            if os.name == 'posix':
+                os.killpg(proc.pid, signal.SIGTERM)
+            else:
+                proc.terminate()
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
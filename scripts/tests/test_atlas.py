@@ -0,0 +1,54 @@
+"""Tests for sprite-atlas packing: a player replaying index.json must reproduce the frames."""
+from PIL import Image
+import numpy as np
+import os
+
+from acscent_media.atlas import ATLAS_PARAMS, pack_atlas, render_atlas
+from acscent_media.frame_io import frame_name
+
+
+def write_frames(directory, frames):
+    os.makedirs(directory)
+    for i, frame in enumerate(frames, 1):
+        Image.fromarray(frame).save(os.path.join(directory, frame_name(i)))
+
+
+def moving_square(count=6, shape=(40, 70)):
+    frames = []
+    for k in range(count):
+        frame = np.full(shape + (3,), 30, dtype=np.uint8)
+        frame[10:20, 5 + 8 * k:15 + 8 * k] = (250, 200, 0)
+        frames.append(frame)
+    frames.insert(3, frames[2].copy())      # a held frame extends the previous draw
+    return frames
+
+
+def test_lossless_replay_is_exact(tmp_path):
+    frames = moving_square()
+    write_frames(tmp_path / 'frames', frames)
+    params = dict(ATLAS_PARAMS, tile=16, page_size=64)
+    index = pack_atlas(str(tmp_path / 'frames'), str(tmp_path / 'atlas'), params=params, log=lambda *a: None)
+
+    assert index['columns'] == 5 and index['slots_per_page'] == 16
+    assert sum(f['duration'] for f in index['frames']) == len(frames)
+    assert len(index['frames']) == len(frames) - 1
+
+    replayed = []
+    for duration, canvas in render_atlas(str(tmp_path / 'atlas')):
+        replayed += [canvas] * duration
+    assert len(replayed) == len(frames)
+    assert all(np.array_equal(a, b) for a, b in zip(replayed, frames))
+    # Identical background tiles are stored once, so pages hold far fewer tiles than were drawn
+    drawn = sum(len(f['tiles']) // 2 for f in index['frames'])
+    assert drawn > len(index['pages']) * index['slots_per_page'] // 2
+
+
+def test_repack_drops_stale_pages(tmp_path):
+    frames = moving_square()
+    write_frames(tmp_path / 'frames', frames)
+    small = dict(ATLAS_PARAMS, tile=16, page_size=32)
+    first = pack_atlas(str(tmp_path / 'frames'), str(tmp_path / 'atlas'), params=small, log=lambda *a: None)
+    assert len(first['pages']) > 1
+    second = pack_atlas(str(tmp_path / 'frames'), str(tmp_path / 'atlas'),
+                        params=dict(small, page_size=256), log=lambda *a: None)
+    assert sorted(n for n in os.listdir(tmp_path / 'atlas') if n.startswith('atlas_')) == second['pages']
@@ -0,0 +1,41 @@
+"""Tests for frame comparison metrics and the compare-frames report."""
+from PIL import Image
+import json
+import numpy as np
+import os
+
+from acscent_media.compare import compare_frames, psnr, ssim
+from acscent_media.frame_io import frame_name
+
+
+def test_psnr_and_ssim():
+    rng = np.random.default_rng(7)
+    a = rng.uniform(0, 255, (2, 32, 32, 3)).astype(np.float32)
+    b = a.copy()
+    b[1] += 10
+    p = psnr(a, b)
+    assert np.isinf(p[0]) and abs(p[1] - 10 * np.log10(255 ** 2 / 100)) < 1e-3
+    s = ssim(a, b)
+    assert abs(s[0] - 1) < 1e-6 and s[1] < 1
+
+
+def test_compare_frames_report(tmp_path):
+    rng = np.random.default_rng(8)
+    for name in ('a', 'b'):
+        os.makedirs(tmp_path / name)
+    for i in (1, 2, 3):
+        frame = rng.integers(0, 256, (40, 50, 3), dtype=np.uint8)
+        Image.fromarray(frame).save(tmp_path / 'a' / frame_name(i))
+        if i == 2:
+            frame = frame.copy()
+            frame[:10, :10] = 0
+        Image.fromarray(frame).save(tmp_path / 'b' / frame_name(i))
+
+    results = compare_frames(str(tmp_path / 'a'), str(tmp_path / 'b'), str(tmp_path / 'cmp'), chunk=2,
+                             log=lambda *a: None)
+    assert [r['frame'] for r in results] == [1, 2, 3]
+    assert results[0]['psnr'] is None and results[2]['psnr'] is None
+    assert 0 < results[1]['changed_pixels'] <= 100 and results[1]['max_diff'] > 8
+    with open(tmp_path / 'cmp' / 'compare.json', encoding='utf-8') as f:
+        assert json.load(f)['summary']['identical'] == 2
+    assert {'heat_changed.png', 'heat_residual_text.png'} <= set(os.listdir(tmp_path / 'cmp'))
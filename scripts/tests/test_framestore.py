@@ -0,0 +1,97 @@
+"""Tests for the .npy frame store, PNG/store conversion and the incremental clean-frames manifest."""
+from PIL import Image
+import numpy as np
+import os
+
+from acscent_media.cli import default_output
+from acscent_media.frame_io import frame_name, load_manifest, save_manifest
+from acscent_media.framestore import FrameStore, convert_frames, create_frames, open_frames
+from acscent_media.pipeline import clean_frames
+
+
+def write_pngs(directory, count, shape=(24, 32), keys=True):
+    rng = np.random.default_rng(1)
+    os.makedirs(directory, exist_ok=True)
+    frames = {}
+    for i in range(1, count + 1):
+        frames[i] = rng.integers(0, 256, shape + (3,), dtype=np.uint8)
+        Image.fromarray(frames[i]).save(os.path.join(directory, frame_name(i)))
+    if keys:
+        save_manifest(str(directory), {frame_name(i): f'key{i}' for i in frames})
+    return frames
+
+
+def quiet(*args):
+    pass
+
+
+def test_store_png_round_trip(tmp_path):
+    frames = write_pngs(tmp_path / 'png', 5)
+    store_path = str(tmp_path / 'sub' / 'frames.npy')
+    assert convert_frames(str(tmp_path / 'png'), store_path, log=quiet) == (5, 5)
+
+    store = open_frames(store_path)
+    assert isinstance(store, FrameStore)
+    assert store.numbers() == [1, 2, 3, 4, 5]
+    assert all(np.array_equal(store.read(i), frames[i]) for i in frames)
+    assert np.array_equal(store.read_range(2, 4), np.stack([frames[i] for i in (2, 3, 4)]))
+    # Build keys travel with the frames
+    assert store.load_keys() == {frame_name(i): f'key{i}' for i in frames}
+
+    assert convert_frames(store_path, str(tmp_path / 'back'), log=quiet) == (5, 5)
+    back = open_frames(str(tmp_path / 'back'))
+    assert back.numbers() == [1, 2, 3, 4, 5]
+    assert all(np.array_equal(back.read(i), frames[i]) for i in frames)
+    assert load_manifest(str(tmp_path / 'back')) == store.load_keys()
+
+
+def test_convert_is_incremental(tmp_path):
+    write_pngs(tmp_path / 'png', 4)
+    store_path = str(tmp_path / 'frames.npy')
+    convert_frames(str(tmp_path / 'png'), store_path, log=quiet)
+    assert convert_frames(str(tmp_path / 'png'), store_path, log=quiet) == (4, 0)
+    assert convert_frames(str(tmp_path / 'png'), store_path, force=True, log=quiet) == (4, 4)
+
+    # A changed key rewrites just that frame
+    keys = load_manifest(str(tmp_path / 'png'))
+    keys[frame_name(3)] = 'changed'
+    save_manifest(str(tmp_path / 'png'), keys)
+    assert convert_frames(str(tmp_path / 'png'), store_path, log=quiet) == (4, 1)
+
+
+def test_create_frames_reuses_only_a_matching_store(tmp_path):
+    path = str(tmp_path / 'f.npy')
+    store = create_frames(path, [1, 2], (2, 3, 3))
+    store.write(2, np.full((2, 3, 3), 9, dtype=np.uint8))
+    store.finish([1, 2], {frame_name(2): 'k'})
+
+    same = create_frames(path, [1, 2], (2, 3, 3))
+    assert same.load_keys() == {frame_name(2): 'k'}
+    assert same.read(2)[0, 0, 0] == 9
+    other = create_frames(path, [1, 2, 3], (2, 3, 3))
+    assert other.load_keys() == {} and len(other) == 3
+
+
+def test_clean_frames_manifest_and_store_match_png(tmp_path):
+    write_pngs(tmp_path / 'src', 4, shape=(48, 64), keys=False)
+    src = str(tmp_path / 'src')
+    assert clean_frames(src, str(tmp_path / 'out'), log=quiet) == (4, 4)
+    assert clean_frames(src, str(tmp_path / 'out'), log=quiet) == (4, 0)
+    assert clean_frames(src, str(tmp_path / 'out'), force=True, log=quiet) == (4, 4)
+    os.remove(os.path.join(src, frame_name(4)))
+    assert clean_frames(src, str(tmp_path / 'out'), log=quiet) == (3, 0)
+    assert open_frames(str(tmp_path / 'out')).numbers() == [1, 2, 3]
+
+    store_src = str(tmp_path / 'src.npy')
+    convert_frames(src, store_src, log=quiet)
+    out = str(tmp_path / 'out.npy')
+    assert clean_frames(store_src, out, log=quiet) == (3, 3)
+    assert clean_frames(store_src, out, log=quiet) == (3, 0)
+    png, store = open_frames(str(tmp_path / 'out')), open_frames(out)
+    assert all(np.array_equal(png.read(i), store.read(i)) for i in (1, 2, 3))
+
+
+def test_default_output_next_to_store():
+    assert default_output('processing', 'cleaned') == os.path.join('processing', 'cleaned')
+    assert default_output(os.path.join('work', 'p.npy'), 'cleaned.npy') == os.path.join('work', 'p_cleaned.npy')
+    assert default_output('c.npy', 'final.mp4') == 'c_final.mp4'
@@ -0,0 +1,33 @@
+"""Tests for span recording, including spans merged back from pool workers."""
+from PIL import Image
+import numpy as np
+
+from acscent_media.cli import main
+from acscent_media.frame_io import frame_name
+from acscent_media.instrument import recording, span
+
+
+def write_frames(directory, count, shape=(48, 64)):
+    rng = np.random.default_rng(0)
+    directory.mkdir()
+    for i in range(1, count + 1):
+        Image.fromarray(rng.integers(0, 256, shape + (3,), dtype=np.uint8)).save(directory / frame_name(i))
+
+
+def test_memory_spans_carry_allocation_args():
+    with recording(memory=True) as rec:
+        with span('outer'):
+            with span('inner'):
+                np.ones(1 << 16)
+    assert [e['name'] for e in rec.events] == ['inner', 'outer']
+    assert all('peak_gain_kb' in e['args'] and 'alloc_kb' in e['args'] for e in rec.events)
+
+
+def test_clean_frames_tracemalloc_with_workers(tmp_path, capsys):
+    write_frames(tmp_path / 'frames', 6)
+    code = main(['clean-frames', '--proc-dir', str(tmp_path / 'frames'), '--out-dir', str(tmp_path / 'out'),
+                 '--workers', '2', '--tracemalloc'])
+    assert code == 0
+    err = capsys.readouterr().err
+    assert 'Python allocations peak' in err
+    assert len(list((tmp_path / 'out').glob('frame_*.png'))) == 6
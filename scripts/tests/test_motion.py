@@ -0,0 +1,45 @@
+"""Tests for block-matching motion estimation and interpolation."""
+import numpy as np
+from scipy.ndimage import gaussian_filter
+
+from acscent_media.motion import MotionInterpolator, block_motion, dense_flow
+
+
+def textured(shape=(64, 96), seed=2):
+    rng = np.random.default_rng(seed)
+    base = gaussian_filter(rng.uniform(0, 255, shape), 2)
+    return np.repeat(base[:, :, None], 3, axis=2).clip(0, 255).astype(np.uint8)
+
+
+def shifted(frame, dy, dx):
+    return np.roll(frame, (dy, dx), axis=(0, 1))
+
+
+def test_block_motion_finds_a_global_shift():
+    a = textured()
+    b = shifted(a, 3, -5)
+    vectors = block_motion(a, b)
+    assert vectors.shape == (4, 6, 2)
+    inner = vectors[1:-1, 1:-1].reshape(-1, 2)
+    assert (inner == [3, -5]).all()
+
+
+def test_static_frames_have_no_motion():
+    a = textured()
+    assert not block_motion(a, a).any()
+
+
+def test_dense_flow_of_uniform_vectors_is_uniform():
+    vectors = np.tile(np.array([2, -1])[None, None, :], (3, 4, 1))
+    flow = dense_flow(vectors, (48, 64, 3), 16)
+    assert flow.shape == (2, 48, 64)
+    assert np.allclose(flow[0], 2) and np.allclose(flow[1], -1)
+
+
+def test_midpoint_lands_halfway():
+    a = textured()
+    frames = np.stack([a, shifted(a, 0, 4), shifted(a, 0, 8)])
+    mid = MotionInterpolator(frames).between(0, 1, 0.5)
+    expected = shifted(a, 0, 2)
+    inner = (slice(16, -16), slice(16, -16))
+    assert np.abs(mid[inner].astype(int) - expected[inner]).mean() < 2
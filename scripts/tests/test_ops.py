@@ -0,0 +1,120 @@
+"""Tests for acscent_media.ops, checked against the straightforward full-frame versions."""
+import numpy as np
+from scipy.ndimage import binary_dilation, distance_transform_edt
+
+from acscent_media.ops import (
+    add_outline, channel_mask, composite, gaussian_blur, grow_mask, inpaint, inpaint_halo, mask_bbox,
+)
+
+
+def random_mask(shape, density, seed):
+    return np.random.default_rng(seed).random(shape) < density
+
+
+def disk(radius):
+    y, x = np.ogrid[-radius:radius + 1, -radius:radius + 1]
+    return x * x + y * y <= radius * radius
+
+
+def test_channel_mask_bounds():
+    rgb = np.array([[[10, 200, 30], [100, 100, 100]],
+                    [[250, 250, 250], [0, 0, 0]]], dtype=np.uint8)
+    assert channel_mask(rgb, above=(50, 50, 50)).tolist() == [[False, True], [True, False]]
+    assert channel_mask(rgb, below=(150, 150, 150)).tolist() == [[False, True], [False, True]]
+    assert channel_mask(rgb, above=(50, 50, 50), below=(150, 150, 150)).tolist() == [[False, True], [False, False]]
+    assert channel_mask(rgb).all()
+
+
+def test_channel_mask_out_is_reset():
+    rgb = np.full((2, 3, 3), 100, dtype=np.uint8)
+    out = np.zeros((2, 3), dtype=bool)
+    assert channel_mask(rgb, above=(50, 50, 50), out=out) is out
+    assert out.all()
+
+
+def test_mask_bbox():
+    mask = np.zeros((10, 12), dtype=bool)
+    assert mask_bbox(mask) is None
+    mask[3, 4] = mask[5, 8] = True
+    assert mask_bbox(mask) == (3, 6, 4, 9)
+    assert mask_bbox(mask, 2) == (1, 8, 2, 11)
+    # Padding is clipped to the mask
+    assert mask_bbox(mask, 5) == (0, 10, 0, 12)
+
+
+def test_grow_mask_matches_full_frame_dilation():
+    for seed, iterations in [(0, 1), (1, 3), (2, 8)]:
+        mask = np.zeros((60, 80), dtype=bool)
+        mask[20:30, 30:45] = random_mask((10, 15), 0.1, seed)
+        expected = binary_dilation(mask, iterations=iterations)
+        out = grow_mask(mask, iterations)
+        assert out is mask
+        assert np.array_equal(mask, expected)
+
+
+def test_grow_mask_at_frame_edge_and_empty():
+    mask = np.zeros((20, 20), dtype=bool)
+    mask[0, 19] = True
+    expected = binary_dilation(mask, iterations=4)
+    assert np.array_equal(grow_mask(mask, 4), expected)
+    empty = np.zeros((5, 5), dtype=bool)
+    assert not grow_mask(empty, 3).any()
+
+
+def test_composite_copies_rgb_only_where_masked():
+    dst = np.zeros((4, 4, 4), dtype=np.float32)
+    src = np.full((4, 4, 3), 200, dtype=np.uint8)
+    mask = np.zeros((4, 4), dtype=bool)
+    mask[1:3, 2] = True
+    assert composite(dst, src, mask) is dst
+    assert (dst[mask, :3] == 200).all()
+    assert (dst[~mask] == 0).all()
+    assert (dst[:, :, 3] == 0).all()
+
+
+def reference_outline(region, text_mask, radius, soft_radius, color=(255, 255, 255)):
+    """The original fix_text_color outline: disk dilations for both zones, blend by distance."""
+    region = region.copy()
+    dilated = binary_dilation(text_mask, structure=disk(radius))
+    outline_zone = dilated & ~text_mask
+    soft_zone = binary_dilation(text_mask, structure=disk(soft_radius)) & ~dilated & ~text_mask
+    color = np.asarray(color, dtype=region.dtype)
+    region[outline_zone, :3] = color
+    dist = distance_transform_edt(~text_mask)
+    soft_blend = np.clip(1.0 - (dist - radius) / (soft_radius - radius), 0, 1)[:, :, None]
+    blended = region[:, :, :3] * (1 - soft_blend) + color * soft_blend
+    region[soft_zone, :3] = blended[soft_zone]
+    return region
+
+
+def test_add_outline_matches_disk_dilation():
+    rng = np.random.default_rng(3)
+    region = rng.uniform(0, 255, (120, 160, 3))
+    text_mask = np.zeros((120, 160), dtype=bool)
+    text_mask[50:60, 40:110] = random_mask((10, 70), 0.3, 4)
+    text_mask[5, 150] = True                    # outline clipped by the region edge
+    for radius, soft_radius in [(6, 10), (18, 25)]:
+        expected = reference_outline(region, text_mask, radius, soft_radius)
+        out = add_outline(region.copy(), text_mask, radius, soft_radius)
+        np.testing.assert_allclose(out, expected, atol=1e-9)
+
+
+def test_add_outline_without_text_is_unchanged():
+    region = np.full((10, 10, 3), 7.0)
+    assert np.array_equal(add_outline(region, np.zeros((10, 10), dtype=bool), 3, 5), np.full((10, 10, 3), 7.0))
+
+
+def test_inpaint_tile_matches_full_frame_blur():
+    rng = np.random.default_rng(5)
+    h, w, radius = 200, 240, 8
+    src = rng.integers(0, 256, (h, w, 3), dtype=np.uint8)
+    mask = np.zeros((h, w), dtype=bool)
+    mask[80:110, 90:150] = random_mask((30, 60), 0.5, 6)
+    assert inpaint_halo(radius) == 24
+
+    dst = src.astype(np.float32)
+    inpaint(dst, src, mask, radius)
+    expected = src.astype(np.float32)
+    composite(expected, gaussian_blur(src, radius), mask)
+    assert np.array_equal(dst, expected)
+    assert np.array_equal(dst[~mask], src[~mask].astype(np.float32))
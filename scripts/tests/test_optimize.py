@@ -0,0 +1,62 @@
+"""Tests for acscent_media.optimize on a small generated images directory."""
+from PIL import Image, features
+import json
+import os
+import pytest
+
+from acscent_media.cli import build_parser
+from acscent_media.optimize import MANIFEST, VARIANTS_DIR, optimize_media
+
+MEDIA = {'widths': [8, 16], 'formats': ['webp'], 'webp_quality': 80, 'avif_quality': 60}
+
+
+def write_image(path, color, size=(32, 16)):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    Image.new('RGB', size, color).save(path)
+
+
+def test_same_stem_sources_keep_separate_variants(tmp_path):
+    write_image(tmp_path / 'foo.png', (255, 0, 0))
+    write_image(tmp_path / 'foo.jpg', (0, 0, 255))
+    images = optimize_media(str(tmp_path), media=MEDIA, log=lambda *a: None)
+
+    srcs = [v['src'] for entry in images.values() for v in entry['variants']]
+    assert sorted(srcs) == ['/images/variants/foo.jpg-16.webp', '/images/variants/foo.jpg-8.webp',
+                            '/images/variants/foo.png-16.webp', '/images/variants/foo.png-8.webp']
+    with Image.open(tmp_path / VARIANTS_DIR / 'foo.png-16.webp') as img:
+        assert img.convert('RGB').getpixel((0, 0))[0] > 200
+    with Image.open(tmp_path / VARIANTS_DIR / 'foo.jpg-16.webp') as img:
+        assert img.convert('RGB').getpixel((0, 0))[2] > 200
+
+
+def test_rerun_reuses_and_prunes(tmp_path):
+    write_image(tmp_path / 'a' / 'bg.png', (10, 200, 10))
+    write_image(tmp_path / 'old.png', (0, 0, 0))
+    optimize_media(str(tmp_path), media=MEDIA, log=lambda *a: None)
+    os.remove(tmp_path / 'old.png')
+
+    lines = []
+    images = optimize_media(str(tmp_path), media=MEDIA, log=lines.append)
+    assert list(images) == ['/images/a/bg.png']
+    assert lines and all('(unchanged)' in line for line in lines)
+    assert sorted(os.listdir(tmp_path / VARIANTS_DIR)) == ['a', MANIFEST]
+    with open(tmp_path / VARIANTS_DIR / MANIFEST, encoding='utf-8') as f:
+        assert json.load(f)['images'] == images
+
+
+def test_nothing_to_encode_is_refused(tmp_path, monkeypatch):
+    write_image(tmp_path / 'bg.png', (0, 0, 0))
+    for media in (dict(MEDIA, widths=[]), dict(MEDIA, widths=[0, 8]), dict(MEDIA, formats=[])):
+        with pytest.raises(SystemExit):
+            optimize_media(str(tmp_path), media=media, log=lambda *a: None)
+    monkeypatch.setattr(features, 'check', lambda name: False)
+    with pytest.raises(SystemExit, match='AVIF'):
+        optimize_media(str(tmp_path), media=dict(MEDIA, formats=['avif']), log=lambda *a: None)
+    assert not (tmp_path / VARIANTS_DIR).exists()
+
+
+def test_cli_rejects_empty_lists(capsys):
+    for option in ('--widths', '--formats'):
+        with pytest.raises(SystemExit):
+            build_parser().parse_args(['optimize-media', option, ','])
+        assert 'expected at least one value' in capsys.readouterr().err
@@ -0,0 +1,109 @@
+"""Tests for the frame sinks build-video writes through."""
+from PIL import Image
+import numpy as np
+import os
+import pytest
+
+from acscent_media.frame_io import frame_name, list_frames
+from acscent_media.framestore import open_frames
+from acscent_media.sinks import ConcatSink, FfmpegSink, PngSink, RawSink, StoreSink, WebpSink
+
+
+def solid(value, shape=(4, 6, 3)):
+    return np.full(shape, value, dtype=np.uint8)
+
+
+# (frame, count, key): a held source frame, a blend, the same source frame again, another hold
+RUNS = [(solid(10), 3, 1), (solid(50), 1, None), (solid(10), 2, 1), (solid(90), 4, 2)]
+TOTAL = sum(count for _, count, _ in RUNS)
+
+
+def write_runs(sink, runs=RUNS):
+    for frame, count, key in runs:
+        sink.write(frame, count, key)
+    sink.close()
+    return sink
+
+
+def test_png_sink_links_repeats_and_skips_unchanged(tmp_path):
+    out = tmp_path / 'png'
+    sink = write_runs(PngSink(str(out)))
+    assert sink.count == TOTAL and list_frames(str(out)) == list(range(1, TOTAL + 1))
+    assert sink.encoded == 3
+    inode = {i: os.stat(out / frame_name(i)).st_ino for i in range(1, TOTAL + 1)}
+    # Every repeat of source frame 1 is the file first written for it
+    assert inode[1] == inode[2] == inode[3] == inode[5] == inode[6]
+    assert inode[7] == inode[10] and inode[4] != inode[1]
+    with Image.open(out / frame_name(6)) as img:
+        assert np.array_equal(np.asarray(img), solid(10))
+
+    assert write_runs(PngSink(str(out))).encoded == 0
+    # A shorter timeline drops the frames past its end
+    sink = write_runs(PngSink(str(out)), RUNS[:2])
+    assert sink.encoded == 0 and list_frames(str(out)) == [1, 2, 3, 4]
+
+
+def test_concat_sink_writes_unique_frames_and_durations(tmp_path):
+    out = tmp_path / 'concat'
+    sink = write_runs(ConcatSink(str(out), 10))
+    assert sink.count == TOTAL and sink.encoded == 3
+    assert sorted(os.listdir(out)) == ['timeline.ffconcat', 'unique_0001.png', 'unique_0002.png', 'unique_0003.png']
+    lines = (out / 'timeline.ffconcat').read_text().splitlines()
+    durations = [float(line.split()[1]) for line in lines if line.startswith('duration')]
+    assert durations == [0.3, 0.1, 0.2, 0.4]
+    assert lines[-1] == "file 'unique_0003.png'"
+
+
+def test_store_sink_fills_the_preallocated_length(tmp_path):
+    path = str(tmp_path / 'out.npy')
+    sink = write_runs(StoreSink(path, TOTAL))
+    assert sink.count == TOTAL
+    store = open_frames(path)
+    assert store.numbers() == list(range(1, TOTAL + 1))
+    assert [int(store.read(i)[0, 0, 0]) for i in store.numbers()] == [10, 10, 10, 50, 10, 10, 90, 90, 90, 90]
+    assert len(store.load_keys()) == TOTAL
+    assert write_runs(StoreSink(path, TOTAL)).encoded == 0
+
+
+def test_raw_and_webp_sinks_count_every_frame(tmp_path):
+    raw = write_runs(RawSink(str(tmp_path / 'out.rgb')))
+    assert raw.count == TOTAL
+    assert os.path.getsize(tmp_path / 'out.rgb') == TOTAL * solid(0).nbytes
+
+    webp = write_runs(WebpSink(str(tmp_path / 'out.webp'), 60, lossless=True))
+    assert webp.count == TOTAL
+    with Image.open(tmp_path / 'out.webp') as img:
+        assert img.n_frames == len(RUNS)
+        total_ms = 0
+        for k in range(img.n_frames):
+            img.seek(k)
+            img.load()
+            total_ms += img.info['duration']
+    assert total_ms == round(TOTAL * 1000 / 60)
+
+
+def fake_ffmpeg(directory, script):
+    path = directory / 'ffmpeg'
+    path.write_text('#!/bin/sh\n' + script + '\n')
+    path.chmod(0o755)
+
+
+def test_ffmpeg_failure_is_reported_with_its_exit_code(tmp_path, monkeypatch):
+    fake_ffmpeg(tmp_path, 'echo "Unknown encoder" >&2; exit 3')
+    monkeypatch.setenv('PATH', f'{tmp_path}{os.pathsep}{os.environ["PATH"]}')
+    sink = FfmpegSink(str(tmp_path / 'out.mp4'), 60)
+    frame = np.zeros((256, 256, 3), dtype=np.uint8)
+    with pytest.raises(SystemExit, match='ffmpeg exited with code 3'):
+        for _ in range(20):
+            sink.write(frame, 10)
+        sink.close()
+    sink.close()        # the finally block of a render closes again; nothing left to report
+
+
+def test_ffmpeg_success_closes_cleanly(tmp_path, monkeypatch):
+    fake_ffmpeg(tmp_path, 'cat > /dev/null')
+    monkeypatch.setenv('PATH', f'{tmp_path}{os.pathsep}{os.environ["PATH"]}')
+    sink = FfmpegSink(str(tmp_path / 'out.mp4'), 60)
+    sink.write(np.zeros((4, 4, 3), dtype=np.uint8), 3)
+    sink.close()
+    assert sink.count == 3
@@ -0,0 +1,67 @@
+"""Tests for timeline planning and rendering: frame counts must match timeline_length()."""
+import numpy as np
+import pytest
+
+from acscent_media.framestore import create_frames, open_frames
+from acscent_media.sinks import StoreSink
+from acscent_media.timeline import render_timeline, retime, retime_plan, timeline_length
+
+
+def make_store(path, count=6, shape=(4, 5, 3)):
+    store = create_frames(str(path), range(1, count + 1), shape)
+    for i in range(1, count + 1):
+        store.write(i, np.full(shape, i * 40, dtype=np.uint8))
+    store.finish(store.numbers(), {})
+    return str(path)
+
+
+@pytest.mark.parametrize('num_target', [0, 1, 2, 7, 30])
+@pytest.mark.parametrize('ease', ['linear', 'ease-in-out'])
+def test_retime_plan_lengths(num_target, ease):
+    src_idx, weight = retime_plan(5, num_target, ease)
+    assert len(src_idx) == len(weight) == num_target
+    if num_target:
+        assert src_idx[0] == 0 and weight[0] == 0
+    if num_target > 1:
+        assert src_idx[-1] == 4 and weight[-1] == 0
+
+
+def test_retime_plan_steps_through_every_source_frame():
+    src_idx, weight = retime_plan(4, 4)
+    assert src_idx.tolist() == [0, 1, 2, 3]
+    assert not weight.any()
+
+
+def test_retime_yields_num_target_frames():
+    frames = np.stack([np.full((2, 2, 3), v, dtype=np.uint8) for v in (0, 100, 200)])
+    for num_target in (0, 1, 5):
+        for interpolate in ('blend', 'motion'):
+            assert len(list(retime(frames, num_target, [1, 2, 3], interpolate=interpolate))) == num_target
+    out = list(retime(frames, 5, [1, 2, 3]))
+    assert [key for key, _ in out] == [1, None, 2, None, 3]
+    assert out[1][1][0, 0, 0] == 50
+
+
+def test_render_timeline_matches_timeline_length(tmp_path):
+    source = make_store(tmp_path / 'src.npy')
+    spec = {'fps': 10, 'segments': [
+        {'type': 'hold', 'frame': 1, 'frames': 3},
+        {'type': 'retime', 'from': 2, 'to': 5, 'frames': 0},
+        {'type': 'retime', 'from': 2, 'to': 5, 'frames': 1},
+        {'type': 'reverse', 'from': 2, 'to': 4, 'duration': 0.5},
+        {'type': 'crossfade', 'from': 1, 'to': 6, 'frames': 0},
+        {'type': 'crossfade', 'from': 1, 'to': 6, 'frames': 1},
+        {'type': 'retime', 'from': 1, 'to': 6, 'frames': 0, 'interpolate': 'motion'},
+        {'type': 'retime', 'from': 1, 'to': 6, 'frames': 9, 'interpolate': 'motion'},
+    ]}
+    total = timeline_length(spec)
+    assert total == 3 + 0 + 1 + 5 + 0 + 1 + 9
+    sink = StoreSink(str(tmp_path / 'out.npy'), total)
+    assert render_timeline(spec, source, sink, log=lambda *a: None) == total
+
+    out = open_frames(str(tmp_path / 'out.npy'))
+    assert out.numbers() == list(range(1, total + 1))
+    # 1-frame retime and crossfade segments show their first source frame
+    assert out.read(4)[0, 0, 0] == 80
+    assert out.read(10)[0, 0, 0] == 40
+    assert out.read(5)[0, 0, 0] == 160      # reverse starts at its last frame